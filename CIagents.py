@@ -1,8 +1,11 @@
 import time
 import queue
 import random
+import argparse
 import threading
-from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from contextlib import nullcontext
+
+# Пулы исполнителей импортируются внутри функций: запуск через cli не тянет concurrent.futures заранее
 
 # Конфигурация симуляции
 NUM_TASKS = 20  #Кол-во задач
@@ -33,7 +36,7 @@ def cpu_intensive_pipeline_step(task_id):
     return elapsed
 
 
-def simulate_ci_agent_thread(agent_id, task_queue, results_queue, semaphore):
+def simulate_ci_agent_thread(agent_id, task_queue, results_queue, semaphore, profiler=None):
     while True:
         with semaphore:
             try:
@@ -42,7 +45,8 @@ def simulate_ci_agent_thread(agent_id, task_queue, results_queue, semaphore):
                 break
 
         print(f"Thread Agent {agent_id} started task {task_id}")
-        execution_time = simulate_io_task(duration)
+        with profiler.tag(agent_id, task_id) if profiler else nullcontext():
+            execution_time = simulate_io_task(duration)
         print(f"Thread Agent {agent_id} finished task {task_id} in {execution_time:.2f}s")
         results_queue.put((task_id, execution_time))
         task_queue.task_done()
@@ -50,7 +54,7 @@ def simulate_ci_agent_thread(agent_id, task_queue, results_queue, semaphore):
     print(f"Thread Agent {agent_id} shutting down.")
 
 
-def run_threading_simulation(tasks):
+def run_threading_simulation(tasks, profiler=None):
     print("\nThreading Simulation ")
     task_queue = queue.Queue()
     results_queue = queue.Queue()
@@ -59,11 +63,12 @@ def run_threading_simulation(tasks):
     for task_id, duration in tasks:
         task_queue.put((task_id, duration))
 
+    from concurrent.futures import ThreadPoolExecutor
     start_time = time.perf_counter()
 
     with ThreadPoolExecutor(max_workers=N_AGENT * 2) as executor:
         futures = [
-            executor.submit(simulate_ci_agent_thread, i, task_queue, results_queue, semaphore)
+            executor.submit(simulate_ci_agent_thread, i, task_queue, results_queue, semaphore, profiler)
             for i in range(N_AGENT * 2) # Запускаем N_AGENT * 2 потоков
         ]
         for future in futures:
@@ -82,14 +87,160 @@ def run_threading_simulation(tasks):
     return total_time
 
 
-def run_multiprocessing_simulation(tasks):
+def execute_task(task, cpu_executor):
+    if task.kind == 'cpu':
+        return cpu_executor.submit(cpu_intensive_pipeline_step, task.task_id).result()
+    return simulate_io_task(task.duration)
+
+
+def simulate_ci_agent_stream(agent_id, task_queue, results_queue, cpu_executor, start_time, profiler=None):
+    # Агент для потоковой нагрузки (workloads.Task): ждёт задачи до сигнала остановки None,
+    # CPU-задачи отдаёт в пул процессов, I/O выполняет сам
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+
+        waited = time.perf_counter() - start_time - task.arrival
+        print(f"Thread Agent {agent_id} started {task.kind} task {task.task_id} after {waited:.2f}s in queue")
+        with profiler.tag(agent_id, task.task_id) if profiler else nullcontext():
+            execution_time = execute_task(task, cpu_executor)
+        print(f"Thread Agent {agent_id} finished task {task.task_id} in {execution_time:.2f}s")
+        results_queue.put((task.task_id, waited, execution_time))
+
+    print(f"Thread Agent {agent_id} shutting down.")
+
+
+def feed_workload(workload, task_queue, start_time, agents):
+    # Генератор нагрузки читается лениво: задача попадает в очередь в момент своего прихода
+    # Сигналы остановки отправляются и при ошибке в генераторе (битый трейс), иначе агенты ждут вечно
+    try:
+        for task in workload:
+            delay = task.arrival - (time.perf_counter() - start_time)
+            if delay > 0:
+                time.sleep(delay)
+            task_queue.put(task)
+    finally:
+        for _ in range(agents):
+            task_queue.put(None)
+
+
+def run_workload_simulation(workload, profiler=None, agents=N_AGENT):
+    print("\nThreading Workload Simulation ")
+    from concurrent.futures import ThreadPoolExecutor
+    from worker_sizing import make_process_pool
+    from workloads import wait_summary
+    task_queue = queue.Queue()
+    results_queue = queue.Queue()
+
+    with make_process_pool(N_AGENT) as cpu_executor, ThreadPoolExecutor(max_workers=agents) as executor:
+        start_time = time.perf_counter()
+        futures = [
+            executor.submit(simulate_ci_agent_stream, i, task_queue, results_queue, cpu_executor, start_time, profiler)
+            for i in range(agents)
+        ]
+        feed_workload(workload, task_queue, start_time, agents)
+        for future in futures:
+            future.result()
+        total_time = time.perf_counter() - start_time
+
+    results = []
+    while not results_queue.empty():
+        results.append(results_queue.get())
+    results.sort(key=lambda x: x[0])
+
+    summary = wait_summary(results)
+    print(f"Workload Total Time: {total_time:.2f}s")
+    print(f"Queue wait over {summary['tasks']} tasks: mean {summary['mean_wait']:.2f}s, "
+          f"p95 {summary['p95_wait']:.2f}s, max {summary['max_wait']:.2f}s")
+    return total_time
+
+
+def _run_placed_task(key, task, agent_id, waited, cpu_executor, done, profiler):
+    print(f"Agent {agent_id} started {task.kind} task {task.task_id} after {waited:.2f}s in queue")
+    with profiler.tag(agent_id, task.task_id) if profiler else nullcontext():
+        execution_time = execute_task(task, cpu_executor)
+    done.put((key, task, waited, execution_time))
+
+
+def run_placement_simulation(workload, agents=None, strategy='best_fit', profiler=None):
+    # Агент — не слот, а ёмкость: диспетчер упаковывает на него столько задач, сколько влезает по
+    # cpu/mem/io. Неразмещённые задачи ждут, и при каждом освобождении очередь просматривается
+    # целиком (задача поменьше может обойти крупную)
+    print(f"\nPlacement Simulation ({strategy})")
+    from worker_sizing import make_process_pool
+    from placement import Placer, demand_for, print_placement_report
+    from workloads import wait_summary
+    placer = Placer(agents, strategy)
+    done = queue.Queue()
+    tasks = iter(workload)
+    next_task = next(tasks, None)
+    pending, results, fragmentation = [], [], []
+    running = arrived = 0
+
+    with make_process_pool(N_AGENT) as cpu_executor:
+        start_time = time.perf_counter()
+        while next_task is not None or pending or running:
+            now = time.perf_counter() - start_time
+            while next_task is not None and next_task.arrival <= now:
+                # Ключ в Placer — номер прихода: task_id в трейсе может повторяться
+                pending.append((arrived, next_task))
+                arrived += 1
+                next_task = next(tasks, None)
+
+            still_pending = []
+            for key, task in pending:
+                agent_id = placer.place(key, demand_for(task))
+                if agent_id is None:
+                    still_pending.append((key, task))
+                    continue
+                waited = time.perf_counter() - start_time - task.arrival
+                threading.Thread(target=_run_placed_task, daemon=True,
+                                 args=(key, task, agent_id, waited, cpu_executor, done, profiler)).start()
+                running += 1
+            pending = still_pending
+            if pending:
+                fragmentation.append(placer.fragmentation(demand_for(pending[0][1])))
+
+            timeout = None if next_task is None else max(0.0, next_task.arrival - (time.perf_counter() - start_time))
+            try:
+                key, task, waited, execution_time = done.get(timeout=timeout)
+            except queue.Empty:
+                continue
+            placer.release(key)
+            running -= 1
+            results.append((task.task_id, waited, execution_time))
+        total_time = time.perf_counter() - start_time
+
+    results.sort(key=lambda x: x[0])
+    print(f"Placement Total Time: {total_time:.2f}s")
+    print_placement_report(placer, wait_summary(results), fragmentation)
+    return total_time
+
+
+def run_multiprocessing_simulation(tasks, profiler=None, backend='processes'):
     print("\nMultiprocessing Simulation ")
     task_ids = [task_id for task_id, _ in tasks]
+    if backend == 'auto':
+        from cpu_backends import select_backend
+        backend = select_backend()
+    if backend != 'processes':
+        return _run_cpu_backend_simulation(task_ids, backend)
 
+    from worker_sizing import make_process_pool
     start_time = time.perf_counter()
 
-    with ProcessPoolExecutor(max_workers=N_AGENT) as executor:
-        results = list(executor.map(cpu_intensive_pipeline_step, task_ids))
+    with make_process_pool(N_AGENT) as executor:
+        if profiler and profiler.mode == 'sampling':
+            # Сэмплер работает внутри каждого процесса, стеки сливаются в общий профиль под тегом задачи
+            from functools import partial
+            from agent_profiling import sample_call
+            sampled = list(executor.map(partial(sample_call, cpu_intensive_pipeline_step), task_ids))
+            results = [result for result, _ in sampled]
+            for task_id, (_, samples) in zip(task_ids, sampled):
+                profiler.merge(('process', task_id), samples)
+        else:
+            results = list(executor.map(cpu_intensive_pipeline_step, task_ids))
 
     end_time = time.perf_counter()
     total_time = end_time - start_time
@@ -100,17 +251,91 @@ def run_multiprocessing_simulation(tasks):
     return total_time
 
 
-if __name__ == "__main__":
-    tasks = [
-        (i, random.uniform(TASK_DURATION_MIN, TASK_DURATION_MAX))
-        for i in range(NUM_TASKS)
-    ]
+def _run_cpu_backend_simulation(task_ids, backend):
+    from cpu_backends import get_backend
+    start_time = time.perf_counter()
 
-    print(f"Simulating {NUM_TASKS} CI tasks with {N_AGENT} max agents...")
+    with get_backend(backend, N_AGENT) as cpu_backend:
+        results = cpu_backend.map(task_ids)
 
-    threading_time = run_threading_simulation(tasks)
-    multiprocessing_time = run_multiprocessing_simulation(tasks)
+    total_time = time.perf_counter() - start_time
+    print(f"CPU backend '{backend}' Total Time: {total_time:.2f}s")
+    print(f"CPU backend '{backend}' Results: {list(zip(task_ids, results))}")
+    return total_time
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate CI agents with threads and processes.")
+    parser.add_argument("--tasks", type=int,
+                        help=f"Number of CI tasks (default: {NUM_TASKS}, a --trace is replayed in full)")
+    parser.add_argument("--mode", choices=['all', 'threading', 'multiprocessing'], default='all')
+    parser.add_argument("--cpu-backend", choices=['auto', 'processes', 'threads', 'subinterpreters', 'numpy'],
+                        default='auto', help="Executor for CPU pipeline steps ('auto' detects the best one)")
+    parser.add_argument("--profile", choices=['sampling', 'cprofile'], help="Profile the run")
+    parser.add_argument("--profile-out",
+                        help="Profile output: .json (speedscope) or collapsed stacks for sampling, .pstats for cprofile "
+                             "(default: agents.speedscope.json / agents.pstats)")
+    parser.add_argument("--pin-workers", action="store_true",
+                        help="Pin each CPU pool worker to its own core (NUMA node by node)")
+    from workloads import add_workload_arguments, workload_from_args
+    add_workload_arguments(parser)
+    args = parser.parse_args(argv)
+
+    import worker_sizing
+    if args.pin_workers:
+        worker_sizing.PIN_WORKERS = True
+    print(f"CPU pool: {worker_sizing.describe(N_AGENT)}{', pinned' if worker_sizing.PIN_WORKERS else ''}")
+
+    profiler = None
+    if args.profile:
+        from agent_profiling import Profiler, output_path
+        streaming = args.placement or args.trace or args.workload != 'uniform'
+        if args.profile == 'cprofile' and args.mode != 'threading' and not streaming:
+            # cProfile работает в потоках агентов; шаги в пуле процессов он не видит
+            parser.error("--profile cprofile covers agent threads only, use --mode threading or --profile sampling")
+        try:
+            args.profile_out = output_path('agents', args.profile, args.profile_out)
+        except ValueError as e:
+            parser.error(str(e))
+        profiler = Profiler(args.profile)
+        profiler.start()
+
+    workload = workload_from_args(args)
+    num_tasks = NUM_TASKS if args.tasks is None else args.tasks
+    if args.placement:
+        from workloads import uniform_workload
+        print(f"Packing CI tasks onto {N_AGENT} agents...")
+        threading_time = run_placement_simulation(workload or uniform_workload(num_tasks), None,
+                                                  args.placement, profiler)
+        multiprocessing_time = None
+    elif workload is not None:
+        # Смешанная I/O+CPU нагрузка идёт одним прогоном: CPU-задачи уходят в пул процессов по ходу
+        print(f"Simulating {args.workload if not args.trace else args.trace} workload with {N_AGENT} agents...")
+        threading_time = run_workload_simulation(workload, profiler)
+        multiprocessing_time = None
+    else:
+        tasks = [
+            (i, random.uniform(TASK_DURATION_MIN, TASK_DURATION_MAX))
+            for i in range(num_tasks)
+        ]
+
+        print(f"Simulating {num_tasks} CI tasks with {N_AGENT} max agents...")
+
+        threading_time = run_threading_simulation(tasks, profiler) if args.mode in ('all', 'threading') else None
+        multiprocessing_time = (run_multiprocessing_simulation(tasks, profiler, args.cpu_backend)
+                                if args.mode in ('all', 'multiprocessing') else None)
+
+    if profiler:
+        profiler.stop()
+        profiler.export(args.profile_out)
+        print(f"Profile written to {args.profile_out}")
 
     print("\n Summary")
-    print(f"Threading Total Time: {threading_time:.2f}s")
-    print(f"Multiprocessing Total Time: {multiprocessing_time:.2f}s")
+    if threading_time is not None:
+        print(f"Threading Total Time: {threading_time:.2f}s")
+    if multiprocessing_time is not None:
+        print(f"Multiprocessing Total Time: {multiprocessing_time:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
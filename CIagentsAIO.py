@@ -1,7 +1,8 @@
 import asyncio
 import time
 import random
-from concurrent.futures import ProcessPoolExecutor
+import argparse
+from contextlib import nullcontext
 
 NUM_TASKS = 20
 N_AGENT = 3
@@ -28,11 +29,12 @@ def run_cpu_intensive_tasks(task_ids):
     return list(map(cpu_intensive_pipeline_step, task_ids))
 
 async def run_multiprocessing_simulation(tasks):
+    from worker_sizing import make_process_pool
     task_ids = [task_id for task_id, _ in tasks]
     start_time = time.perf_counter()
 
     loop = asyncio.get_event_loop()
-    with ProcessPoolExecutor(max_workers=N_AGENT) as executor:
+    with make_process_pool(N_AGENT) as executor:
         results = await loop.run_in_executor(executor, run_cpu_intensive_tasks, task_ids)
 
     end_time = time.perf_counter()
@@ -46,7 +48,7 @@ async def simulate_io_task_async(duration):
     await asyncio.sleep(duration)
     return duration
 
-async def simulate_ci_agent_async(agent_id, task_queue, results, semaphore):
+async def simulate_ci_agent_async(agent_id, task_queue, results, semaphore, profiler=None):
     while True:
         async with semaphore:
             try:
@@ -55,13 +57,14 @@ async def simulate_ci_agent_async(agent_id, task_queue, results, semaphore):
                 break
 
         print(f"Async Agent {agent_id} started task {task_id}")
-        execution_time = await simulate_io_task_async(duration)
+        with profiler.tag(agent_id, task_id) if profiler else nullcontext():
+            execution_time = await simulate_io_task_async(duration)
         print(f"Async Agent {agent_id} finished task {task_id} in {execution_time:.2f}s")
         results.append((task_id, execution_time))
 
     print(f"Async Agent {agent_id} shutting down.")
 
-async def run_asyncio_simulation(tasks):
+async def run_asyncio_simulation(tasks, profiler=None):
     task_queue = asyncio.Queue()
     results = []
     semaphore = asyncio.Semaphore(N_AGENT)
@@ -72,7 +75,7 @@ async def run_asyncio_simulation(tasks):
     start_time = time.perf_counter()
 
     agent_tasks = [
-        asyncio.create_task(simulate_ci_agent_async(i, task_queue, results, semaphore))
+        asyncio.create_task(simulate_ci_agent_async(i, task_queue, results, semaphore, profiler))
         for i in range(N_AGENT * 2)
     ]
 
@@ -86,17 +89,187 @@ async def run_asyncio_simulation(tasks):
     print(f"AsyncIO Results: {results}")
     return total_time
 
-if __name__ == "__main__":
-    tasks = [
-        (i, random.uniform(TASK_DURATION_MIN, TASK_DURATION_MAX))
-        for i in range(NUM_TASKS)
-    ]
+async def simulate_ci_agent_stream_async(agent_id, task_queue, results, cpu_executor, start_time, profiler=None):
+    loop = asyncio.get_running_loop()
+    while True:
+        task = await task_queue.get()
+        if task is None:
+            break
+
+        waited = time.perf_counter() - start_time - task.arrival
+        print(f"Async Agent {agent_id} started {task.kind} task {task.task_id} after {waited:.2f}s in queue")
+        with profiler.tag(agent_id, task.task_id) if profiler else nullcontext():
+            if task.kind == 'cpu':
+                execution_time = await loop.run_in_executor(cpu_executor, cpu_intensive_pipeline_step, task.task_id)
+            else:
+                execution_time = await simulate_io_task_async(task.duration)
+        print(f"Async Agent {agent_id} finished task {task.task_id} in {execution_time:.2f}s")
+        results.append((task.task_id, waited, execution_time))
+
+    print(f"Async Agent {agent_id} shutting down.")
+
+async def feed_workload_async(workload, task_queue, start_time, agents):
+    # Генератор читается лениво, задачи кладутся в очередь в момент прихода
+    try:
+        for task in workload:
+            delay = task.arrival - (time.perf_counter() - start_time)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await task_queue.put(task)
+    finally:
+        for _ in range(agents):
+            await task_queue.put(None)
+
+async def run_asyncio_workload_simulation(workload, profiler=None, agents=N_AGENT):
+    from worker_sizing import make_process_pool
+    from workloads import wait_summary
+    task_queue = asyncio.Queue()
+    results = []
+
+    with make_process_pool(N_AGENT) as cpu_executor:
+        start_time = time.perf_counter()
+        agent_tasks = [
+            asyncio.create_task(simulate_ci_agent_stream_async(i, task_queue, results, cpu_executor, start_time, profiler))
+            for i in range(agents)
+        ]
+        await feed_workload_async(workload, task_queue, start_time, agents)
+        await asyncio.gather(*agent_tasks)
+        total_time = time.perf_counter() - start_time
+
+    results.sort(key=lambda x: x[0])
+    summary = wait_summary(results)
+    print(f"AsyncIO Workload Total Time: {total_time:.2f}s")
+    print(f"Queue wait over {summary['tasks']} tasks: mean {summary['mean_wait']:.2f}s, "
+          f"p95 {summary['p95_wait']:.2f}s, max {summary['max_wait']:.2f}s")
+    return total_time
+
+async def _run_placed_task_async(key, task, agent_id, waited, cpu_executor, done, profiler):
+    loop = asyncio.get_running_loop()
+    print(f"Async Agent {agent_id} started {task.kind} task {task.task_id} after {waited:.2f}s in queue")
+    with profiler.tag(agent_id, task.task_id) if profiler else nullcontext():
+        if task.kind == 'cpu':
+            execution_time = await loop.run_in_executor(cpu_executor, cpu_intensive_pipeline_step, task.task_id)
+        else:
+            execution_time = await simulate_io_task_async(task.duration)
+    await done.put((key, task, waited, execution_time))
 
-    print(f"Simulating {NUM_TASKS} CI tasks with {N_AGENT} max agents...")
+async def run_asyncio_placement_simulation(workload, agents=None, strategy='best_fit', profiler=None):
+    # Как CIagents.run_placement_simulation: несколько задач на агенте, пока хватает cpu/mem/io
+    from worker_sizing import make_process_pool
+    from placement import Placer, demand_for, print_placement_report
+    from workloads import wait_summary
+    placer = Placer(agents, strategy)
+    done = asyncio.Queue()
+    tasks = iter(workload)
+    next_task = next(tasks, None)
+    pending, results, fragmentation, in_flight = [], [], [], set()
+    running = arrived = 0
 
-    asyncio_time = asyncio.run(run_asyncio_simulation(tasks))
-    multiprocessing_time = asyncio.run(run_multiprocessing_simulation(tasks))
+    with make_process_pool(N_AGENT) as cpu_executor:
+        start_time = time.perf_counter()
+        while next_task is not None or pending or running:
+            now = time.perf_counter() - start_time
+            while next_task is not None and next_task.arrival <= now:
+                pending.append((arrived, next_task))
+                arrived += 1
+                next_task = next(tasks, None)
+
+            still_pending = []
+            for key, task in pending:
+                agent_id = placer.place(key, demand_for(task))
+                if agent_id is None:
+                    still_pending.append((key, task))
+                    continue
+                waited = time.perf_counter() - start_time - task.arrival
+                agent_task = asyncio.create_task(
+                    _run_placed_task_async(key, task, agent_id, waited, cpu_executor, done, profiler))
+                in_flight.add(agent_task)
+                agent_task.add_done_callback(in_flight.discard)
+                running += 1
+            pending = still_pending
+            if pending:
+                fragmentation.append(placer.fragmentation(demand_for(pending[0][1])))
+
+            timeout = None if next_task is None else max(0.0, next_task.arrival - (time.perf_counter() - start_time))
+            try:
+                key, task, waited, execution_time = await asyncio.wait_for(done.get(), timeout)
+            except asyncio.TimeoutError:
+                continue
+            placer.release(key)
+            running -= 1
+            results.append((task.task_id, waited, execution_time))
+        total_time = time.perf_counter() - start_time
+
+    results.sort(key=lambda x: x[0])
+    print(f"AsyncIO Placement Total Time: {total_time:.2f}s")
+    print_placement_report(placer, wait_summary(results), fragmentation)
+    return total_time
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate CI agents with asyncio and processes.")
+    parser.add_argument("--tasks", type=int,
+                        help=f"Number of CI tasks (default: {NUM_TASKS}, a --trace is replayed in full)")
+    parser.add_argument("--mode", choices=['all', 'asyncio', 'multiprocessing'], default='all')
+    parser.add_argument("--profile", choices=['sampling', 'cprofile'], help="Profile the asyncio run")
+    parser.add_argument("--profile-out",
+                        help="Profile output: .json (speedscope) or collapsed stacks for sampling, .pstats for cprofile "
+                             "(default: agents-async.speedscope.json / agents-async.pstats)")
+    parser.add_argument("--pin-workers", action="store_true",
+                        help="Pin each CPU pool worker to its own core (NUMA node by node)")
+    from workloads import add_workload_arguments, workload_from_args
+    add_workload_arguments(parser)
+    args = parser.parse_args(argv)
+
+    import worker_sizing
+    if args.pin_workers:
+        worker_sizing.PIN_WORKERS = True
+    print(f"CPU pool: {worker_sizing.describe(N_AGENT)}{', pinned' if worker_sizing.PIN_WORKERS else ''}")
+
+    profiler = None
+    if args.profile:
+        from agent_profiling import Profiler, output_path
+        streaming = args.placement or args.trace or args.workload != 'uniform'
+        if args.mode == 'multiprocessing' and not streaming:
+            parser.error("--profile covers the asyncio run, it has nothing to record with --mode multiprocessing")
+        try:
+            args.profile_out = output_path('agents-async', args.profile, args.profile_out)
+        except ValueError as e:
+            parser.error(str(e))
+        profiler = Profiler(args.profile)
+        profiler.start()
+
+    workload = workload_from_args(args)
+    num_tasks = NUM_TASKS if args.tasks is None else args.tasks
+    if args.placement:
+        from workloads import uniform_workload
+        print(f"Packing CI tasks onto {N_AGENT} agents...")
+        asyncio_time = asyncio.run(run_asyncio_placement_simulation(workload or uniform_workload(num_tasks), None,
+                                                                    args.placement, profiler))
+    elif workload is not None:
+        print(f"Simulating {args.workload if not args.trace else args.trace} workload with {N_AGENT} agents...")
+        asyncio_time = asyncio.run(run_asyncio_workload_simulation(workload, profiler))
+    else:
+        tasks = [
+            (i, random.uniform(TASK_DURATION_MIN, TASK_DURATION_MAX))
+            for i in range(num_tasks)
+        ]
+
+        print(f"Simulating {num_tasks} CI tasks with {N_AGENT} max agents...")
+
+        asyncio_time = asyncio.run(run_asyncio_simulation(tasks, profiler)) if args.mode in ('all', 'asyncio') else None
+    if profiler:
+        profiler.stop()
+        profiler.export(args.profile_out)
+        print(f"Profile written to {args.profile_out}")
+    multiprocessing_time = (asyncio.run(run_multiprocessing_simulation(tasks))
+                            if workload is None and not args.placement and args.mode in ('all', 'multiprocessing') else None)
 
     print("\nSummary")
-    print(f"AsyncIO Total Time: {asyncio_time:.2f}s")
-    print(f"Multiprocessing Total Time: {multiprocessing_time:.2f}s")
+    if asyncio_time is not None:
+        print(f"AsyncIO Total Time: {asyncio_time:.2f}s")
+    if multiprocessing_time is not None:
+        print(f"Multiprocessing Total Time: {multiprocessing_time:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+import sys
+import argparse
+import subprocess
+
+if __package__:
+    from .pidlockfile import PIDLockFile
+else:
+    # Запуск файлом: python DevOps3/pidlock_run.py — каталог скрипта уже в sys.path
+    from pidlockfile import PIDLockFile
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="cli.py lock", description="Run a command under a PID lock file.")
+    parser.add_argument("-f", "--file", default="app.lock", help="Lock file path")
+    parser.add_argument("command", nargs=argparse.REMAINDER, help="Command to run while holding the lock")
+    args = parser.parse_args(argv)
+    command = args.command[1:] if args.command[:1] == ['--'] else args.command
+    if not command:
+        parser.error("command is required")
+
+    try:
+        with PIDLockFile(args.file):
+            return subprocess.call(command)
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
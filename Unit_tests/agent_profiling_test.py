@@ -0,0 +1,148 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from agent_profiling import Profiler, output_path, sample_call
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+    return seconds
+
+
+def tags(profiler):
+    return {tag for tag, _ in profiler.samples}
+
+
+def test_thread_samples_are_tagged_by_agent_and_task():
+    profiler = Profiler(interval=0.001)
+
+    def agent(agent_id):
+        with profiler.tag(agent_id, agent_id * 10):
+            busy(0.05)
+
+    with profiler:
+        threads = [threading.Thread(target=agent, args=(i,)) for i in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    assert {(0, 0), (1, 10)} <= tags(profiler)
+
+
+def test_asyncio_samples_follow_running_task():
+    profiler = Profiler(interval=0.001)
+
+    async def agent(agent_id):
+        for _ in range(5):
+            with profiler.tag(agent_id, 1):
+                busy(0.01)
+            await asyncio.sleep(0)
+
+    async def run():
+        await asyncio.gather(agent("a"), agent("b"))
+
+    with profiler:
+        asyncio.run(run())
+
+    assert {("a", 1), ("b", 1)} <= tags(profiler)
+
+
+def test_exports_collapsed_and_speedscope(tmp_path):
+    profiler = Profiler(interval=0.001)
+    with profiler:
+        with profiler.tag(7, 3):
+            busy(0.03)
+
+    collapsed = profiler.collapsed()
+    assert any(line.startswith("agent-7;task-3;") and "busy (agent_profiling_test.py:" in line
+               for line in collapsed.splitlines())
+
+    path = tmp_path / "profile.json"
+    profiler.export(str(path))
+    doc = json.loads(path.read_text())
+    profile = next(p for p in doc["profiles"] if p["name"] == "agent-7")
+    assert profile["type"] == "sampled"
+    assert len(profile["samples"]) == len(profile["weights"])
+    assert doc["shared"]["frames"][profile["samples"][0][0]]["name"] == "task-3"
+
+
+def test_sample_call_returns_result_and_stacks():
+    result, samples = sample_call(busy, 0.03, interval=0.001)
+
+    assert result == 0.03
+    assert any(stack[-1][0] == "busy" for stack in samples)
+
+
+def test_cprofile_mode_collects_stats(tmp_path):
+    profiler = Profiler("cprofile")
+    with profiler:
+        with profiler.tag(0, 0):
+            busy(0.01)
+
+    path = tmp_path / "run.pstats"
+    profiler.export(str(path))
+    assert path.stat().st_size > 0
+    assert any(func[2] == "busy" for func in profiler.stats().stats)
+
+
+def test_cprofile_mode_covers_several_agent_threads(tmp_path):
+    # На 3.12+ второй активный cProfile в другом потоке падал с "Another profiling tool is already active"
+    profiler = Profiler("cprofile")
+
+    def agent(agent_id):
+        with profiler.tag(agent_id, agent_id):
+            busy(0.01)
+
+    with profiler:
+        threads = [threading.Thread(target=agent, args=(i,)) for i in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    busy_calls = [counts[1] for func, counts in profiler.stats().stats.items() if func[2] == "busy"]
+    assert sum(busy_calls) == 3
+    profiler.export(str(tmp_path / "run.pstats"))
+
+
+def test_cprofile_without_tagged_work_fails_clearly(tmp_path):
+    profiler = Profiler("cprofile")
+    with profiler:
+        busy(0.01)
+
+    with pytest.raises(RuntimeError, match="collected nothing"):
+        profiler.export(str(tmp_path / "run.pstats"))
+
+
+def test_output_path_follows_mode():
+    assert output_path("agents", "cprofile") == "agents.pstats"
+    assert output_path("agents", "sampling") == "agents.speedscope.json"
+    assert output_path("agents", "sampling", "out.folded") == "out.folded"
+    with pytest.raises(ValueError, match="pstats"):
+        output_path("agents", "cprofile", "out.json")
+
+
+@pytest.mark.parametrize("module, argv", [
+    ("CIagents", ["--mode", "multiprocessing", "--profile", "cprofile"]),
+    ("CIagents", ["--mode", "threading", "--profile", "cprofile", "--profile-out", "out.json"]),
+    ("CIagentsAIO", ["--mode", "multiprocessing", "--profile", "sampling"]),
+])
+def test_cli_rejects_profile_it_cannot_write(module, argv, capsys):
+    main = __import__(module).main
+    with pytest.raises(SystemExit) as exc:
+        main(argv)
+
+    assert exc.value.code == 2
+    assert "error" in capsys.readouterr().err
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        Profiler("perf")
@@ -0,0 +1,56 @@
+from pathlib import Path
+
+import pytest
+
+from book_parsers import BACKENDS, get_parser
+
+FIXTURES = Path(__file__).parent / "fixtures" / "books"
+BASE = "http://example.com/"
+
+
+@pytest.fixture(params=list(BACKENDS))
+def parser(request):
+    try:
+        return get_parser(request.param)
+    except ImportError:
+        pytest.skip(f"{request.param} backend not installed")
+
+
+def chunked(body, size=97):
+    return (body[i:i + size] for i in range(0, len(body), size))
+
+
+def test_parse_listing(parser):
+    html = (FIXTURES / "index.html").read_bytes()
+
+    books, next_url, total_pages = parser.parse_listing(html, BASE)
+
+    assert books == [
+        {"title": "A Light in the Attic", "price": "£51.77",
+         "url": BASE + "catalogue/a-light-in-the-attic_1000/index.html"},
+        {"title": "Tipping the Velvet", "price": "£53.74",
+         "url": BASE + "catalogue/tipping-the-velvet_999/index.html"},
+    ]
+    assert next_url == BASE + "catalogue/page-2.html"
+    assert total_pages == 3
+
+
+def test_parse_last_listing_page(parser):
+    html = (FIXTURES / "catalogue" / "page-3.html").read_bytes()
+
+    books, next_url, total_pages = parser.parse_listing(chunked(html), BASE + "catalogue/page-3.html")
+
+    assert [b["title"] for b in books] == ["Sapiens: A Brief History of Humankind"]
+    assert next_url is None
+    assert total_pages == 3
+
+
+def test_parse_product(parser):
+    html = (FIXTURES / "catalogue" / "soumission_998" / "index.html").read_bytes()
+
+    assert parser.parse_product(chunked(html)) == {"availability": "In stock (20 available)",
+                                                   "upc": "6957f44c3847a760"}
+
+
+def test_auto_picks_installed_backend():
+    assert get_parser().name in BACKENDS
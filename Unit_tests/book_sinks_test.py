@@ -0,0 +1,85 @@
+import csv
+import json
+from decimal import Decimal
+
+import pytest
+
+from book_sinks import FIELDS, normalize_book, open_sink
+
+BOOKS = [
+    {"title": "A Light in the Attic", "price": "£51.77", "availability": "In stock (22 available)",
+     "upc": "a897fe39b1053632", "url": "http://example.com/a"},
+    {"title": "Listing only", "price": "£3.5", "url": "http://example.com/b"},
+]
+
+
+def test_normalize_book_types_price_and_stock():
+    record = normalize_book(BOOKS[0])
+
+    assert record["price"] == Decimal("51.77")
+    assert record["currency"] == "GBP"
+    assert record["in_stock"] == 22
+    assert tuple(record) == FIELDS
+
+
+def test_normalize_book_without_details():
+    record = normalize_book(BOOKS[1])
+
+    assert record["price"] == Decimal("3.5")
+    assert record["in_stock"] is None
+    assert record["upc"] is None
+
+
+def write_all(path, format=None):
+    with open_sink(path, format) as sink:
+        for book in BOOKS:
+            sink.write(normalize_book(book))
+
+
+def test_csv_sink(tmp_path):
+    path = tmp_path / "books.csv"
+    write_all(path)
+
+    with open(path, encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+
+    assert rows[0][:2] == ["Название", "Цена"]
+    assert rows[1][:4] == ["A Light in the Attic", "51.77", "GBP", "22"]
+
+
+def test_ndjson_sink_keeps_exact_price(tmp_path):
+    path = tmp_path / "books.part"
+    write_all(path, "ndjson")
+
+    records = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+    assert records[0]["price"] == "51.77"
+    assert records[1]["in_stock"] is None
+
+
+def test_parquet_sink(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "books.parquet"
+    write_all(path)
+
+    table = pq.read_table(path)
+
+    assert str(table.schema.field("price").type) == "decimal128(12, 2)"
+    assert table.column("price").to_pylist() == [Decimal("51.77"), Decimal("3.50")]
+
+
+def test_excel_sink(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    path = tmp_path / "books.xlsx"
+    write_all(path)
+
+    rows = list(openpyxl.load_workbook(path).active.values)
+
+    assert rows[0][0] == "Название"
+    assert rows[1][:3] == ("A Light in the Attic", 51.77, "GBP")
+
+
+def test_unknown_format(tmp_path):
+    with pytest.raises(ValueError, match="Unsupported output format"):
+        with open_sink(tmp_path / "books.txt"):
+            pass
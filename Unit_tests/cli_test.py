@@ -0,0 +1,61 @@
+import os
+import datetime
+import subprocess
+import sys
+from pathlib import Path
+
+import cli
+from startup_budget import check, parse_importtime
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+
+def test_dispatches_to_timestamps(tmp_path):
+    target = tmp_path / "f"
+    target.touch()
+
+    cli.main(["timestamps", "--target", str(target), "--set-time", "2020-01-01 00:00:00"])
+
+    assert os.stat(target).st_mtime_ns == round(datetime.datetime(2020, 1, 1).timestamp()) * 10**9
+
+
+def test_unknown_command(capsys):
+    assert cli.main(["nope"]) == 2
+    assert "Unknown command" in capsys.readouterr().err
+
+
+def test_lock_runs_command(tmp_path):
+    lock_path = tmp_path / "run.lock"
+
+    assert cli.main(["lock", "-f", str(lock_path), "--", sys.executable, "-c", "raise SystemExit(3)"]) == 3
+    assert not lock_path.exists()
+
+
+def test_lock_runner_works_as_script(tmp_path):
+    result = subprocess.run([sys.executable, str(REPO_DIR / "DevOps3" / "pidlock_run.py"),
+                             "-f", str(tmp_path / "app.lock"), "--", sys.executable, "-c", "pass"],
+                            cwd=tmp_path, capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+
+
+def test_subcommands_import_only_what_they_need():
+    code = ("import sys, cli; cli.resolve('timestamps'); "
+            "print(sorted(m for m in ('concurrent.futures', 'requests', 'pandas', 'asyncio') if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", code], cwd=REPO_DIR, capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == "[]"
+
+
+def test_parse_importtime():
+    stderr = ("import time: self [us] | cumulative | imported package\n"
+              "import time:       120 |        120 |   _json\n"
+              "import time:      2000 |       2120 | json\n")
+
+    assert parse_importtime(stderr) == {"_json": 120, "json": 2000}
+
+
+def test_timestamps_startup_within_budget():
+    (elapsed, budget), = check(["timestamps"], runs=3, scale=3).values()
+
+    assert elapsed <= budget
@@ -0,0 +1,20 @@
+import os
+import sys
+from pathlib import Path
+
+# Модули лежат в корне репозитория; добавляем его в конец, чтобы не перекрыть копии в Unit_tests
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+
+def pytest_addoption(parser):
+    # Опции набора производительности (Unit_tests/perf)
+    group = parser.getgroup("perf", "performance regression suite")
+    group.addoption("--perf-save", action="store_true", help="Store measured medians as the new baselines")
+    group.addoption("--perf-compare", action="store_true", help="Fail benchmarks slower than baseline * (1 + tolerance)")
+    group.addoption("--perf-tolerance", type=float, default=float(os.environ.get("PERF_TOLERANCE", 0.5)),
+                    help="Allowed slowdown over the baseline, 0.5 = 50%% (env PERF_TOLERANCE)")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "perf(rounds=5, warmup=1, tolerance=None, reference=True): benchmark rounds, "
+                                       "allowed slowdown and machine-speed normalization for the perf suite")
@@ -0,0 +1,49 @@
+import pytest
+
+import cpu_backends
+from cpu_backends import BACKENDS, available_backends, get_backend, numpy_primes, select_backend
+
+
+def python_primes(limit):
+    return [n for n in range(2, limit) if all(n % i for i in range(2, int(n ** 0.5) + 1))]
+
+
+@pytest.mark.parametrize("name", list(BACKENDS))
+def test_backend_runs_every_task(name):
+    if name not in available_backends():
+        pytest.skip(f"{name} backend not available in this interpreter")
+    task_ids = list(range(6))
+
+    with get_backend(name, workers=2) as backend:
+        results = backend.map(task_ids)
+
+    assert len(results) == len(task_ids)
+    assert all(isinstance(elapsed, float) and elapsed >= 0 for elapsed in results)
+
+
+def test_numpy_sieve_matches_trial_division():
+    pytest.importorskip("numpy")
+
+    assert numpy_primes(1000).tolist() == python_primes(1000)
+    assert numpy_primes(2).tolist() == []
+
+
+def test_auto_prefers_threads_without_gil(monkeypatch):
+    monkeypatch.setattr(cpu_backends, "is_free_threaded", lambda: True)
+
+    assert select_backend() == "threads"
+
+
+def test_auto_falls_back_to_processes(monkeypatch):
+    monkeypatch.setattr(cpu_backends, "is_free_threaded", lambda: False)
+    monkeypatch.setattr(cpu_backends, "_interpreter_pool_executor", lambda: None)
+
+    assert select_backend() == "processes"
+    assert get_backend("auto").name == "processes"
+
+
+def test_unavailable_backend_rejected(monkeypatch):
+    monkeypatch.setattr(cpu_backends, "_interpreter_pool_executor", lambda: None)
+
+    with pytest.raises(RuntimeError, match="not available"):
+        get_backend("subinterpreters")
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from dataclass import Fleet, Service
+
+
+def make_fleet(n):
+    return Fleet(Service(f"svc-{i}", replicas=i % 5, containers=[f"c{i}"]) for i in range(n))
+
+
+def test_service_is_slotted():
+    service = Service("Test")
+
+    with pytest.raises(AttributeError):
+        service.extra = 1
+
+
+def test_fleet_grows_and_materializes_services():
+    fleet = make_fleet(100)
+
+    assert len(fleet) == 100
+    assert fleet["svc-7"] == Service("svc-7", 2, ["c7"])
+    assert [s.name for s in fleet][:3] == ["svc-0", "svc-1", "svc-2"]
+
+
+def test_duplicate_service_rejected():
+    fleet = make_fleet(1)
+
+    with pytest.raises(ValueError):
+        fleet.add(Service("svc-0"))
+
+
+def test_scale_where_clamps_at_zero():
+    fleet = make_fleet(10)
+
+    scaled = fleet.scale_where(lambda f: f.replicas >= 2, -3)
+
+    assert scaled == 6
+    assert fleet.replicas.tolist() == [0, 1, 0, 0, 1, 0, 1, 0, 0, 1]
+
+
+def test_scale_where_by_name_prefix():
+    fleet = Fleet([Service("web-a", 1), Service("db-a", 1), Service("web-b", 2)])
+
+    fleet.scale_where(fleet.name_startswith("web-"), 2)
+
+    assert fleet.replicas.tolist() == [3, 1, 4]
+    assert fleet.total_replicas() == 8
+
+
+def test_scale_where_rejects_wrong_mask():
+    fleet = make_fleet(3)
+
+    with pytest.raises(ValueError):
+        fleet.scale_where(np.array([True]), 1)
+
+
+def test_diff_and_apply_desired_state():
+    fleet = make_fleet(5)
+    desired = {"svc-1": 1, "svc-3": 0, "svc-4": 7}
+
+    assert fleet.diff(desired) == {"svc-3": -3, "svc-4": 3}
+
+    fleet.apply(desired)
+
+    assert fleet.replicas.tolist() == [0, 1, 2, 0, 7]
+    assert fleet.diff(np.array([0, 1, 2, 0, 7])) == {}
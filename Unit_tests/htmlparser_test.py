@@ -0,0 +1,209 @@
+import os
+import json
+import time
+import shutil
+import threading
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from pathlib import Path
+
+import pytest
+
+from crawl_cache import CrawlCache
+import htmlparser
+from htmlparser import RateLimiter, crawl, main, make_session
+
+FIXTURES = Path(__file__).parent / "fixtures" / "books"
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    requested = []
+    request_headers = []
+
+    def do_GET(self):
+        self.requested.append(self.path)
+        self.request_headers.append(dict(self.headers))
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(directory):
+    QuietHandler.requested = []
+    QuietHandler.request_headers = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(QuietHandler, directory=str(directory)))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def books_site():
+    yield from serve(FIXTURES)
+
+
+@pytest.fixture
+def editable_site(tmp_path):
+    # Копия фикстур, страницы которой тест может менять между запусками
+    root = tmp_path / "site"
+    shutil.copytree(FIXTURES, root)
+    for url in serve(root):
+        yield url, root
+
+
+def retitle(root, old, new):
+    index = root / "index.html"
+    index.write_text(index.read_text().replace(old, new))
+    # If-Modified-Since сравнивается с точностью до секунды
+    stamp = time.time() + 10
+    os.utime(index, (stamp, stamp))
+
+
+@pytest.mark.parametrize("parser", ["bs4", "stream"])
+def test_crawl_follows_pagination_and_details(books_site, parser):
+    books = crawl(books_site, max_workers=4, rate=None, parser=parser)
+
+    assert [b["title"] for b in books] == [
+        "A Light in the Attic", "Tipping the Velvet", "Soumission", "Sharp Objects",
+        "Sapiens: A Brief History of Humankind",
+    ]
+    assert books[0]["upc"] == "a897fe39b1053632"
+    assert books[4]["availability"] == "In stock (20 available)"
+    assert len(QuietHandler.requested) == len(set(QuietHandler.requested)) == 3 + 5
+
+
+def test_crawl_listing_only(books_site):
+    books = crawl(books_site, max_workers=2, rate=None, details=False)
+
+    assert len(books) == 5
+    assert "upc" not in books[0]
+    assert len(QuietHandler.requested) == 3
+
+
+def test_crawl_skips_missing_pages(books_site):
+    books = crawl(books_site + "missing.html", session=make_session(retries=0), rate=None)
+
+    assert books == []
+
+
+def test_rate_limiter_spaces_requests():
+    limiter = RateLimiter(50)
+
+    start = time.monotonic()
+    for _ in range(6):
+        limiter.wait()
+
+    assert time.monotonic() - start >= 5 / 50 * 0.9
+
+
+def test_crawl_cache_skips_unchanged_pages(books_site, tmp_path):
+    cache = CrawlCache(tmp_path / "cache")
+    first = crawl(books_site, max_workers=4, rate=None, cache=cache)
+    assert cache.changed == 8
+    cache.commit()
+
+    cache = CrawlCache(tmp_path / "cache")
+    second = crawl(books_site, max_workers=4, rate=None, cache=cache)
+
+    assert second == first
+    assert (cache.changed, cache.unchanged, cache.not_modified) == (0, 0, 8)
+    assert "If-Modified-Since" in QuietHandler.request_headers[-1]
+
+
+def test_crawl_cache_uses_content_hash_without_validators(books_site, tmp_path):
+    cache = CrawlCache(tmp_path / "cache")
+    crawl(books_site, max_workers=4, rate=None, details=False, cache=cache)
+    cache.commit()
+    for entry_path in (tmp_path / "cache").glob("*.json"):
+        entry = json.loads(entry_path.read_text())
+        entry["last_modified"] = None
+        entry_path.write_text(json.dumps(entry))
+
+    cache = CrawlCache(tmp_path / "cache")
+    books = crawl(books_site, max_workers=4, rate=None, details=False, cache=cache)
+
+    assert len(books) == 5
+    assert (cache.changed, cache.unchanged, cache.not_modified) == (0, 3, 0)
+
+
+def test_crawl_cache_streams_body_into_parser(books_site, tmp_path):
+    received = []
+
+    def parse(body):
+        received.append(body)
+        return b"".join(body).decode()[:15]
+
+    cache = CrawlCache(tmp_path / "cache")
+    first = cache.fetch(make_session(1), books_site, parse, chunk_size=1024)
+    cache.commit()
+    second = CrawlCache(tmp_path / "cache").fetch(make_session(1), books_site, parse, chunk_size=1024)
+
+    assert not isinstance(received[0], (bytes, str))
+    assert first == second == "<!DOCTYPE html>"
+
+
+def test_main_rejects_output_without_known_extension(tmp_path, capsys):
+    with pytest.raises(SystemExit) as exc:
+        main(["-o", str(tmp_path / "books"), "--no-cache"])
+
+    assert exc.value.code == 2
+    assert "unsupported output format" in capsys.readouterr().err
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_main_removes_part_file_when_crawl_fails(tmp_path, monkeypatch):
+    def broken_crawl(*args, **kwargs):
+        yield (1, 0), {"title": "A Light in the Attic", "price": "£51.77"}
+        raise ConnectionError("catalogue went away")
+
+    monkeypatch.setattr(htmlparser, "iter_crawl", broken_crawl)
+
+    with pytest.raises(ConnectionError):
+        main(["-o", str(tmp_path / "books.csv"), "--no-cache"])
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def crawl_args(site, tmp_path, output):
+    return ["--url", site, "--no-details", "--rate", "0", "--cache-dir", str(tmp_path / "cache"),
+            "-o", str(tmp_path / output)]
+
+
+def test_main_rewrites_output_built_from_older_cache(editable_site, tmp_path):
+    site, root = editable_site
+    main(crawl_args(site, tmp_path, "a.csv"))
+    retitle(root, "A Light in the Attic", "A Light in the Cellar")
+    main(crawl_args(site, tmp_path, "b.csv"))
+
+    # Для кэша ничего не изменилось, но a.csv собран до правки страницы
+    main(crawl_args(site, tmp_path, "a.csv"))
+
+    assert "A Light in the Cellar" in (tmp_path / "a.csv").read_text()
+
+
+def test_main_keeps_cache_behind_after_interrupted_crawl(editable_site, tmp_path, monkeypatch):
+    site, root = editable_site
+    main(crawl_args(site, tmp_path, "a.csv"))
+    retitle(root, "A Light in the Attic", "A Light in the Cellar")
+
+    def interrupted(book):
+        raise KeyboardInterrupt
+
+    with monkeypatch.context() as patch:
+        patch.setattr(htmlparser, "normalize_book", interrupted)
+        with pytest.raises(KeyboardInterrupt):
+            main(crawl_args(site, tmp_path, "a.csv"))
+    main(crawl_args(site, tmp_path, "a.csv"))
+
+    assert "A Light in the Cellar" in (tmp_path / "a.csv").read_text()
+
+
+def test_main_keeps_output_when_nothing_changed(editable_site, tmp_path, capsys):
+    site, _ = editable_site
+    main(crawl_args(site, tmp_path, "a.csv"))
+    main(crawl_args(site, tmp_path, "a.csv"))
+
+    assert "Nothing changed, keeping" in capsys.readouterr().out
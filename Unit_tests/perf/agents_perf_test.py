@@ -0,0 +1,39 @@
+import io
+import asyncio
+from contextlib import redirect_stdout
+
+import pytest
+
+from CIagents import cpu_intensive_pipeline_step, run_threading_simulation
+from CIagentsAIO import run_asyncio_simulation
+
+AGENT_TASKS = 60
+IO_DURATION = 0.002
+
+
+def quiet(func, *args):
+    # Агенты печатают каждую задачу; вывод в замер не нужен
+    with redirect_stdout(io.StringIO()):
+        return func(*args)
+
+
+@pytest.mark.perf(rounds=15)
+def test_prime_step(benchmark):
+    # Самый тяжёлый шаг: task_id % 100 == 99
+    benchmark(cpu_intensive_pipeline_step, 99)
+
+
+@pytest.mark.perf(rounds=5, reference=False)
+def test_threading_agent_throughput(benchmark):
+    tasks = [(i, IO_DURATION) for i in range(AGENT_TASKS)]
+    benchmark.items = AGENT_TASKS
+
+    benchmark(quiet, run_threading_simulation, tasks)
+
+
+@pytest.mark.perf(rounds=5, reference=False)
+def test_asyncio_agent_throughput(benchmark):
+    tasks = [(i, IO_DURATION) for i in range(AGENT_TASKS)]
+    benchmark.items = AGENT_TASKS
+
+    benchmark(quiet, lambda: asyncio.run(run_asyncio_simulation(tasks)))
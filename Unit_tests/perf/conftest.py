@@ -0,0 +1,155 @@
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import platform
+import statistics
+from pathlib import Path
+
+import pytest
+
+# Бенчмарки в духе pytest-benchmark: benchmark(func, *args) гоняет func несколько раундов и
+# запоминает медиану и лучший раунд. Базовые значения лежат в baselines.json рядом:
+#   pytest Unit_tests/perf --perf-save      — перезаписать базу на этой машине
+#   pytest Unit_tests/perf --perf-compare   — упасть, если лучший раунд хуже базы больше чем на tolerance
+# Сравнивается min, а не медиана: на общей CI-машине шум только добавляет время, и min от него устойчивее.
+# Перед каждым раундом замеряется эталонный цикл (reference): если машина целиком медленнее, чем при записи
+# базы (троттлинг, соседи по хосту), сравнивается отношение min / reference, а не абсолютное время.
+# Бенчмаркам, которые в основном спят, эталон только мешает: perf(reference=False).
+# Файловые бенчмарки работают в bench_dir (tmpfs, если есть): задержки виртуального диска в разы больше
+# самого кода и делают сравнение бессмысленным
+# Бенчмаркам, упирающимся в файловую систему, допуск можно расширить маркером perf(tolerance=...)
+BASELINES = Path(__file__).with_name("baselines.json")
+REFERENCE_ITERATIONS = 50_000
+_results = {}
+
+
+def load_baselines(path=BASELINES):
+    if not path.exists():
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f).get("benchmarks", {})
+
+
+def save_baselines(results, path=BASELINES):
+    # Сливаем с уже сохранёнными, чтобы частичный прогон не терял остальные базы
+    benchmarks = load_baselines(path)
+    benchmarks.update(results)
+    data = {
+        "machine": {"python": platform.python_version(), "implementation": platform.python_implementation(),
+                    "platform": sys.platform, "arch": platform.machine()},
+        "benchmarks": dict(sorted(benchmarks.items())),
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+
+
+def reference_loop():
+    total = 0
+    for i in range(REFERENCE_ITERATIONS):
+        total += i * i
+    return total
+
+
+def slowdown(stats, baseline):
+    # Во сколько раз лучший раунд медленнее базы, с поправкой на скорость машины, если она известна
+    ratio = stats["min"] / baseline["min"]
+    if stats.get("reference") and baseline.get("reference"):
+        ratio /= stats["reference"] / baseline["reference"]
+    return ratio - 1
+
+
+def regression(stats, baseline, tolerance):
+    # Сообщение об ошибке или None, если лучший раунд в пределах допуска
+    change = slowdown(stats, baseline)
+    if change <= tolerance:
+        return None
+    return (f"{stats['min'] * 1000:.3f} ms vs baseline {baseline['min'] * 1000:.3f} ms "
+            f"(+{change:.0%} adjusted for machine speed, tolerance {tolerance:.0%})")
+
+
+class Benchmark:
+    def __init__(self, name, rounds=5, warmup=1, baseline=None, tolerance=None, reference=True):
+        self.name = name
+        self.rounds = rounds
+        self.warmup = warmup
+        self.reference = reference
+        self.baseline = baseline
+        self.tolerance = tolerance
+        self.items = 1  # сколько единиц работы в одном вызове — для вывода пропускной способности
+        self.stats = None
+
+    def __call__(self, func, *args, **kwargs):
+        return self.pedantic(func, args, kwargs)
+
+    def pedantic(self, func, args=(), kwargs=None, setup=None):
+        # setup вызывается перед каждым раундом и в замер не входит
+        kwargs = kwargs or {}
+        for _ in range(self.warmup):
+            if setup:
+                setup()
+            func(*args, **kwargs)
+        times, reference = [], []
+        for _ in range(self.rounds):
+            if self.reference:
+                start = time.perf_counter()
+                reference_loop()
+                reference.append(time.perf_counter() - start)
+            if setup:
+                setup()
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            times.append(time.perf_counter() - start)
+
+        self.stats = {"median": round(statistics.median(times), 7), "min": round(min(times), 7),
+                      "rounds": self.rounds, "items": self.items}
+        if reference:
+            self.stats["reference"] = round(min(reference), 7)
+        _results[self.name] = self.stats
+        if self.baseline and self.tolerance is not None:
+            message = regression(self.stats, self.baseline, self.tolerance)
+            if message:
+                pytest.fail(f"{self.name} regressed: {message}", pytrace=False)
+        return result
+
+
+@pytest.fixture
+def benchmark(request):
+    marker = request.node.get_closest_marker("perf")
+    options = marker.kwargs if marker else {}
+    config = request.config
+    name = f"{request.node.module.__name__}::{request.node.name}"
+    baseline = load_baselines().get(name) if config.getoption("perf_compare") else None
+    # Общий допуск из --perf-tolerance может только расширить допуск бенчмарка, но не сузить
+    tolerance = max(config.getoption("perf_tolerance"), options.get("tolerance", 0.0))
+    return Benchmark(name, options.get("rounds", 5), options.get("warmup", 1), baseline, tolerance,
+                     options.get("reference", True))
+
+
+@pytest.fixture
+def bench_dir(tmp_path):
+    if not os.path.isdir("/dev/shm"):
+        yield tmp_path
+        return
+    path = Path(tempfile.mkdtemp(prefix="perf-", dir="/dev/shm"))
+    yield path
+    shutil.rmtree(path, ignore_errors=True)
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if not _results:
+        return
+    baselines = load_baselines()
+    terminalreporter.section("perf")
+    for name, stats in sorted(_results.items()):
+        rate = stats["items"] / stats["median"] if stats["median"] else float("inf")
+        line = f"{name:<60} {stats['median'] * 1000:10.3f} ms  {rate:14,.0f}/s"
+        if name in baselines:
+            line += f"  (min {slowdown(stats, baselines[name]):+.0%} vs baseline)"
+        terminalreporter.write_line(line)
+    if config.getoption("perf_save"):
+        save_baselines(_results)
+        terminalreporter.write_line(f"Baselines saved to {BASELINES}")
@@ -0,0 +1,39 @@
+import io
+from contextlib import redirect_stdout
+
+import pytest
+
+from DevOps3.pidlockfile import PIDLockFile
+
+CYCLES = 500
+
+
+@pytest.mark.perf(rounds=15, warmup=2, tolerance=1.0)
+def test_lock_acquire_release(benchmark, bench_dir):
+    lock_path = bench_dir / "app.lock"
+    benchmark.items = CYCLES
+
+    def cycle():
+        with redirect_stdout(io.StringIO()):
+            for _ in range(CYCLES):
+                with PIDLockFile(lock_path):
+                    pass
+
+    benchmark(cycle)
+    assert not lock_path.exists()
+
+
+@pytest.mark.perf(rounds=15, warmup=2, tolerance=1.0)
+def test_lock_stale_takeover(benchmark, bench_dir):
+    # Файл от несуществующего процесса: проверка PID + удаление + захват
+    lock_path = bench_dir / "app.lock"
+    benchmark.items = CYCLES
+
+    def cycle():
+        with redirect_stdout(io.StringIO()):
+            for _ in range(CYCLES):
+                lock_path.write_text("999999999")
+                with PIDLockFile(lock_path):
+                    pass
+
+    benchmark(cycle)
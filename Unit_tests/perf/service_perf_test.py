@@ -0,0 +1,25 @@
+import json
+
+import pytest
+
+from service_batch import validate_services, validate_services_json
+
+SERVICES = 5000
+RECORDS = [{"name": f"svc-{i}", "replicas": i % 7, "containers": f"web-{i}, sidecar"} for i in range(SERVICES)]
+
+
+@pytest.mark.perf(rounds=15, tolerance=1.0)
+def test_validate_services(benchmark):
+    benchmark.items = SERVICES
+
+    result = benchmark(validate_services, RECORDS)
+    assert result.ok
+
+
+@pytest.mark.perf(rounds=15, tolerance=1.0)
+def test_validate_services_json(benchmark):
+    payload = json.dumps(RECORDS).encode()
+    benchmark.items = SERVICES
+
+    result = benchmark(validate_services_json, payload)
+    assert result.ok
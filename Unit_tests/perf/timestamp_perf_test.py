@@ -0,0 +1,53 @@
+import io
+import os
+from itertools import count
+
+import pytest
+
+from timestamp_cheat import Progress, bulk_sync_tree, verify_tree
+
+DIRS = 10
+FILES_PER_DIR = 100
+
+
+@pytest.fixture
+def trees(bench_dir):
+    source, target = bench_dir / "src", bench_dir / "dst"
+    for root in (source, target):
+        for d in range(DIRS):
+            (root / f"d{d}").mkdir(parents=True)
+            for f in range(FILES_PER_DIR):
+                (root / f"d{d}" / f"f{f}.txt").write_bytes(b"x")
+    return source, target
+
+
+def quiet_progress():
+    return Progress("Synced", stream=io.StringIO())
+
+
+@pytest.mark.perf(rounds=15, warmup=2, tolerance=1.0)
+def test_bulk_sync_tree(benchmark, trees):
+    source, target = trees
+    stamps = count(1_000_000_000)
+    benchmark.items = DIRS * FILES_PER_DIR
+
+    def touch_source():
+        # Каждый раунд — новые времена у всех файлов, чтобы синхронизация реально писала
+        stamp = next(stamps)
+        for d in range(DIRS):
+            for f in range(FILES_PER_DIR):
+                os.utime(source / f"d{d}" / f"f{f}.txt", (stamp, stamp))
+
+    changed = benchmark.pedantic(lambda: bulk_sync_tree(source, target, progress=quiet_progress()),
+                                 setup=touch_source)
+    assert len(changed) >= DIRS * FILES_PER_DIR
+
+
+@pytest.mark.perf(rounds=15, warmup=2, tolerance=1.0)
+def test_verify_unchanged_tree(benchmark, trees):
+    source, target = trees
+    bulk_sync_tree(source, target, progress=quiet_progress())
+    benchmark.items = DIRS * FILES_PER_DIR
+
+    mismatched = benchmark(lambda: verify_tree(source, target, progress=quiet_progress()))
+    assert mismatched == []
@@ -0,0 +1,52 @@
+import json
+
+from service_batch import iter_validated, validate_services, validate_services_json
+
+
+def test_validate_services_all_valid():
+    records = [{"name": "a", "containers": "x, y"}, {"name": "b", "replicas": 3}]
+
+    result = validate_services(records)
+
+    assert result.ok
+    assert [s.name for s in result.services] == ["a", "b"]
+    assert result.services[0].containers == ["x", "y"]
+    assert result.indices == [0, 1]
+
+
+def test_validate_services_reports_errors_per_record():
+    records = [
+        {"name": "a"},
+        {"name": "b", "replicas": -1},
+        {"name": "c", "containers": ["", "web"]},
+        {"name": "d"},
+    ]
+
+    result = validate_services(records)
+
+    assert [s.name for s in result.services] == ["a", "d"]
+    assert result.indices == [0, 3]
+    assert set(result.errors) == {1, 2}
+    assert result.errors[1][0]["loc"] == ("replicas",)
+    assert "Container names cannot be empty" in result.errors[2][0]["msg"]
+
+
+def test_validate_services_json_fast_path_and_fallback():
+    good = json.dumps([{"name": "a"}, {"name": "b", "containers": "x"}]).encode()
+    bad = json.dumps([{"name": "a"}, {"replicas": 1}]).encode()
+
+    assert [s.name for s in validate_services_json(good).services] == ["a", "b"]
+    result = validate_services_json(bad)
+    assert [s.name for s in result.services] == ["a"]
+    assert list(result.errors) == [1]
+
+
+def test_iter_validated_keeps_global_indices():
+    records = ({"name": f"s{i}", "replicas": -1 if i == 5 else 1} for i in range(7))
+
+    results = list(iter_validated(records, batch_size=3))
+
+    assert len(results) == 3
+    assert list(results[1].errors) == [5]
+    assert results[1].indices == [3, 4]
+    assert sum(len(r.services) for r in results) == 6
@@ -0,0 +1,56 @@
+import io
+import json
+import pytest
+from pydantic import ValidationError
+
+from dataclass import Fleet, Service as ServiceData
+from pydantic_test import Service as ServiceModel
+from service_schema import (dump_json, dump_json_list, fleet_to_models, models_to_fleet, read_ndjson,
+                            read_ndjson_fleet, serializer_for, to_dataclass, to_model, write_ndjson)
+
+
+def test_round_trip_between_models():
+    data = ServiceData("web", 3, ["nginx", "app"])
+
+    model = to_model(data)
+
+    assert isinstance(model, ServiceModel)
+    assert model.replicas == 3
+    assert to_dataclass(model) == data
+
+
+def test_to_model_can_validate():
+    data = ServiceData("web", 1, ["nginx", ""])
+
+    with pytest.raises(ValidationError, match="Container names cannot be empty"):
+        to_model(data, validate=True)
+
+
+def test_serializers_are_cached_and_match():
+    assert serializer_for(ServiceData) is serializer_for(ServiceData)
+    data = ServiceData("web", 2, ["a"])
+
+    assert json.loads(dump_json(data)) == json.loads(dump_json(to_model(data)))
+    assert json.loads(dump_json_list([to_model(data)])) == [{"name": "web", "replicas": 2, "containers": ["a"]}]
+
+
+def test_ndjson_fleet_round_trip():
+    fleet = Fleet(ServiceData(f"s{i}", i, [f"c{i}"]) for i in range(5))
+    buf = io.BytesIO()
+
+    assert write_ndjson(fleet, buf) == 5
+
+    buf.seek(0)
+    restored = read_ndjson_fleet(buf)
+    buf.seek(0)
+    trusted = read_ndjson_fleet(buf, trusted=True)
+    assert list(restored) == list(fleet) == list(trusted)
+    assert models_to_fleet(fleet_to_models(fleet)).replicas.tolist() == [0, 1, 2, 3, 4]
+
+
+def test_read_ndjson_validates_untrusted_input():
+    buf = io.BytesIO(b'{"name": "a", "containers": "x, y"}\n\n')
+
+    (model,) = read_ndjson(buf)
+
+    assert model.containers == ["x", "y"]
@@ -0,0 +1,167 @@
+import io
+import os
+import sys
+import pytest
+
+from timestamp_cheat import (Progress, bulk_sync_tree, bulk_set_times, iter_input_paths, main, scan_tree,
+                             sync_timestamps, verify_tree)
+
+
+def make_tree(root, names):
+    for name in names:
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(name)
+
+
+def test_scan_tree_lists_nested_entries(tmp_path):
+    make_tree(tmp_path, ["a.txt", "sub/b.txt", "sub/deep/c.txt"])
+
+    rel_paths = {os.path.join(rel_dir, name) for rel_dir, entries in scan_tree(tmp_path) for name, _ in entries}
+
+    assert rel_paths == {"a.txt", "sub", os.path.join("sub", "b.txt"),
+                         os.path.join("sub", "deep"), os.path.join("sub", "deep", "c.txt")}
+
+
+def test_bulk_sync_tree_mirrors_timestamps(tmp_path):
+    names = ["a.txt", "sub/b.txt", "sub/deep/c.txt"]
+    source, target = tmp_path / "src", tmp_path / "dst"
+    make_tree(source, names)
+    make_tree(target, names)
+    for i, name in enumerate(names):
+        os.utime(source / name, (1000000000.0 + i, 1000000000.0 + i))
+
+    progress = Progress("Synced", stream=io.StringIO())
+    bulk_sync_tree(source, target, workers=4, progress=progress)
+
+    for i, name in enumerate(names):
+        assert os.stat(target / name).st_mtime == 1000000000.0 + i
+    assert progress.failed == 0
+    assert progress.done == len(names) + 2
+
+
+def test_bulk_sync_tree_counts_missing_targets(tmp_path):
+    source, target = tmp_path / "src", tmp_path / "dst"
+    make_tree(source, ["a.txt", "b.txt"])
+    make_tree(target, ["a.txt"])
+
+    progress = Progress("Synced", stream=io.StringIO())
+    bulk_sync_tree(source, target, progress=progress)
+
+    assert progress.done == 1
+    assert progress.failed == 1
+
+
+def test_missing_target_directory_counts_as_failed(tmp_path):
+    source, target = tmp_path / "src", tmp_path / "dst"
+    make_tree(source, ["a.txt", "sub/b.txt", "sub/c.txt"])
+    make_tree(target, ["a.txt"])
+
+    progress = Progress("Synced", stream=io.StringIO())
+    bulk_sync_tree(source, target, progress=progress)
+
+    # Сам каталог sub и оба файла в нём
+    assert progress.failed == 3
+    assert sorted(verify_tree(source, target, progress=Progress("Verified", stream=io.StringIO()))) == [
+        "sub", os.path.join("sub", "b.txt"), os.path.join("sub", "c.txt")]
+    with pytest.raises(SystemExit) as exc:
+        main(["-r", "-s", str(source), "-t", str(target), "--verify"])
+    assert exc.value.code == 1
+
+
+@pytest.mark.parametrize("attr", ["both", "mtime", "atime"])
+def test_bulk_set_times_from_glob(tmp_path, attr):
+    make_tree(tmp_path, ["x/1.o", "x/2.o", "x/keep.txt"])
+    for path in tmp_path.rglob("*.*"):
+        os.utime(path, (500.0, 500.0))
+
+    paths = iter_input_paths([str(tmp_path / "**" / "*.o")])
+    bulk_set_times(paths, (2000 * 10**9, 3000 * 10**9), attr, workers=2, progress=Progress("Updated", stream=io.StringIO()))
+
+    stat = os.stat(tmp_path / "x" / "1.o")
+    assert stat.st_atime == (500.0 if attr == "mtime" else 2000.0)
+    assert stat.st_mtime == (500.0 if attr == "atime" else 3000.0)
+    assert os.stat(tmp_path / "x" / "keep.txt").st_mtime == 500.0
+
+
+def test_iter_input_paths_reads_stdin(monkeypatch):
+    monkeypatch.setattr(sys, "stdin", io.StringIO("a.txt\n\nb/c.txt\n"))
+
+    assert list(iter_input_paths(from_stdin=True)) == ["a.txt", "b/c.txt"]
+
+
+def test_sync_timestamps_keeps_nanoseconds(tmp_path):
+    source, target = tmp_path / "src", tmp_path / "dst"
+    source.touch()
+    target.touch()
+    exact_ns = 1000000000_123456789
+    os.utime(source, ns=(exact_ns, exact_ns))
+
+    sync_timestamps(source, target)
+
+    assert os.stat(target).st_mtime_ns == exact_ns
+    assert os.stat(target).st_atime_ns == exact_ns
+
+
+def test_sync_timestamps_on_file_descriptors(tmp_path):
+    source, target = tmp_path / "src", tmp_path / "dst"
+    source.touch()
+    target.touch()
+    os.utime(source, ns=(1, 2))
+
+    src_fd, dst_fd = os.open(source, os.O_RDONLY), os.open(target, os.O_RDONLY)
+    try:
+        sync_timestamps(src_fd, dst_fd)
+    finally:
+        os.close(src_fd)
+        os.close(dst_fd)
+
+    assert os.stat(target).st_mtime_ns == 2
+
+
+def test_symlink_timestamps_without_dereference(tmp_path):
+    source, target = tmp_path / "src", tmp_path / "dst"
+    make_tree(source, ["real.txt"])
+    make_tree(target, ["real.txt"])
+    os.symlink("real.txt", source / "link")
+    os.symlink("real.txt", target / "link")
+    os.utime(source / "link", ns=(5 * 10**9, 5 * 10**9), follow_symlinks=False)
+
+    bulk_sync_tree(source, target, progress=Progress("Synced", stream=io.StringIO()), follow_symlinks=False)
+
+    assert os.lstat(target / "link").st_mtime_ns == 5 * 10**9
+
+
+def test_verify_and_skip_unchanged(tmp_path):
+    names = ["a.txt", "sub/b.txt"]
+    source, target = tmp_path / "src", tmp_path / "dst"
+    make_tree(source, names)
+    make_tree(target, names)
+    bulk_sync_tree(source, target, progress=Progress("Synced", stream=io.StringIO()))
+    os.utime(source / "sub" / "b.txt", ns=(7, 7))
+
+    assert verify_tree(source, target, progress=Progress("Verified", stream=io.StringIO())) == [
+        os.path.join("sub", "b.txt")]
+    assert os.stat(target / "sub" / "b.txt").st_mtime_ns != 7
+
+    progress = Progress("Synced", stream=io.StringIO())
+    bulk_sync_tree(source, target, progress=progress)
+
+    assert progress.done == 1
+    assert progress.skipped == len(names)
+    assert verify_tree(source, target, progress=Progress("Verified", stream=io.StringIO())) == []
+
+
+def test_verify_requires_recursive(tmp_path, capsys):
+    source, target = tmp_path / "a.txt", tmp_path / "b.txt"
+    source.write_text("a")
+    target.write_text("b")
+    os.utime(source, ns=(7, 7))
+    before = os.stat(target).st_mtime_ns
+
+    with pytest.raises(SystemExit) as exc:
+        main(["-s", str(source), "-t", str(target), "--verify"])
+
+    assert exc.value.code == 2
+    assert "--verify requires --recursive" in capsys.readouterr().err
+    assert os.stat(target).st_mtime_ns == before
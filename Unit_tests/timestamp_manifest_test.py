@@ -0,0 +1,92 @@
+import io
+import os
+import pytest
+
+from timestamp_cheat import Progress
+from timestamp_manifest import export_manifest, iter_manifest, restore_manifest
+
+
+def make_tree(root, names):
+    for name in names:
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(name)
+
+
+def quiet(label):
+    return Progress(label, stream=io.StringIO())
+
+
+def test_manifest_round_trip_sorted_by_directory(tmp_path):
+    root = tmp_path / "tree"
+    make_tree(root, ["b.txt", "a/x.txt", "a.txt", "a/y.txt"])
+    os.utime(root / "a" / "x.txt", ns=(1000000000_000000001, 1000000000_000000002))
+    manifest = tmp_path / "ts.manifest"
+
+    count = export_manifest(root, manifest)
+    records = list(iter_manifest(manifest))
+
+    assert count == len(records) == 5
+    assert [path for path, *_ in records] == ["a", "a.txt", "b.txt",
+                                             os.path.join("a", "x.txt"), os.path.join("a", "y.txt")]
+    assert records[3][1:] == (1000000000_000000001, 1000000000_000000002, len("a/x.txt"))
+
+
+def test_restore_touches_only_changed_entries(tmp_path):
+    root = tmp_path / "tree"
+    make_tree(root, ["a.txt", "sub/b.txt", "sub/c.txt"])
+    for path in root.rglob("*.txt"):
+        os.utime(path, ns=(10**18, 10**18))
+    manifest = tmp_path / "ts.manifest"
+    export_manifest(root, manifest)
+
+    os.utime(root / "sub" / "b.txt", ns=(5, 5))
+    progress = quiet("Restored")
+    changed = restore_manifest(manifest, root, progress=progress)
+
+    assert changed == [os.path.join("sub", "b.txt")]
+    assert os.stat(root / "sub" / "b.txt").st_mtime_ns == 10**18
+    assert progress.done == 1
+
+
+def test_restore_skips_files_with_different_size(tmp_path):
+    root = tmp_path / "tree"
+    make_tree(root, ["a.txt"])
+    os.utime(root / "a.txt", ns=(10**18, 10**18))
+    manifest = tmp_path / "ts.manifest"
+    export_manifest(root, manifest)
+
+    (root / "a.txt").write_text("rebuilt with new content")
+    progress = quiet("Restored")
+    restore_manifest(manifest, root, progress=progress)
+
+    assert os.stat(root / "a.txt").st_mtime_ns != 10**18
+    assert progress.failed == 1
+
+
+def test_restore_counts_removed_directory_as_failed(tmp_path):
+    import shutil
+    root = tmp_path / "tree"
+    make_tree(root, ["a.txt", "sub/b.txt", "sub/c.txt"])
+    for path in root.rglob("*.txt"):
+        os.utime(path, ns=(10**18, 10**18))
+    manifest = tmp_path / "ts.manifest"
+    export_manifest(root, manifest)
+
+    shutil.rmtree(root / "sub")
+    os.utime(root / "a.txt", ns=(5, 5))
+    progress = quiet("Restored")
+    changed = restore_manifest(manifest, root, progress=progress)
+
+    # Остальное дерево восстанавливается, записи удалённого каталога считаются неудачными
+    assert changed == ["a.txt"]
+    assert os.stat(root / "a.txt").st_mtime_ns == 10**18
+    assert progress.failed == 3
+
+
+def test_rejects_foreign_file(tmp_path):
+    bogus = tmp_path / "bogus"
+    bogus.write_bytes(b"not a manifest at all")
+
+    with pytest.raises(ValueError, match="Not a timestamp manifest"):
+        list(iter_manifest(bogus))
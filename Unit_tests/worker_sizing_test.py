@@ -0,0 +1,102 @@
+import os
+
+import pytest
+
+import worker_sizing
+from worker_sizing import (cgroup_cpu_limit, describe, effective_cpus, make_process_pool, numa_nodes,
+                           parse_cpulist, pinning_plan, pool_size)
+
+
+@pytest.fixture
+def eight_cpus(monkeypatch):
+    monkeypatch.setattr(worker_sizing, "available_cpus", lambda: list(range(8)))
+
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+def cgroup_v2(tmp_path, path, limits):
+    # limits: {относительный путь группы: содержимое cpu.max}
+    root = tmp_path / "cgroup"
+    write(root / "cgroup.controllers", "cpu memory")
+    for group, cpu_max in limits.items():
+        write(root / group / "cpu.max", cpu_max)
+    write(tmp_path / "proc_cgroup", f"0::{path}\n")
+    return str(root), str(tmp_path / "proc_cgroup")
+
+
+def test_v2_quota(tmp_path, eight_cpus):
+    root, proc = cgroup_v2(tmp_path, "/ci/agent", {"ci/agent": "150000 100000"})
+
+    assert cgroup_cpu_limit(root, proc) == 1.5
+    assert effective_cpus(root, proc) == 1
+    assert pool_size(3, root, proc) == 1
+
+
+def test_v2_parent_quota_limits_child(tmp_path, eight_cpus):
+    root, proc = cgroup_v2(tmp_path, "/ci/agent", {"ci/agent": "max 100000", "ci": "400000 100000"})
+
+    assert cgroup_cpu_limit(root, proc) == 4.0
+    assert pool_size(None, root, proc) == 4
+    assert pool_size(3, root, proc) == 3
+
+
+def test_describe_reports_requested_pool(tmp_path, eight_cpus):
+    root, proc = cgroup_v2(tmp_path, "/ci", {"ci": "400000 100000"})
+
+    assert describe(3, root, proc).endswith("-> pool of 3")
+    assert describe(None, root, proc).endswith("-> pool of 4")
+
+
+def test_v2_unlimited_uses_affinity(tmp_path, eight_cpus):
+    root, proc = cgroup_v2(tmp_path, "/", {"": "max 100000"})
+
+    assert cgroup_cpu_limit(root, proc) is None
+    assert effective_cpus(root, proc) == 8
+
+
+def test_hybrid_hierarchy_reads_v1_cpu_controller(tmp_path, eight_cpus):
+    root = tmp_path / "cgroup"
+    write(root / "unified" / "cgroup.controllers", "")
+    write(root / "cpu" / "job" / "cpu.cfs_quota_us", "200000")
+    write(root / "cpu" / "job" / "cpu.cfs_period_us", "100000")
+    write(tmp_path / "proc_cgroup", "1:cpu,cpuacct:/job\n0::/\n")
+
+    assert cgroup_cpu_limit(str(root), str(tmp_path / "proc_cgroup")) == 2.0
+
+
+def test_no_cgroup_info(tmp_path, eight_cpus):
+    assert cgroup_cpu_limit(str(tmp_path), str(tmp_path / "missing")) is None
+
+
+def test_parse_cpulist():
+    assert parse_cpulist("0-3,8-9,16") == [0, 1, 2, 3, 8, 9, 16]
+    assert parse_cpulist("") == []
+
+
+def test_numa_nodes_filtered_by_affinity(tmp_path):
+    write(tmp_path / "node0" / "cpulist", "0-3")
+    write(tmp_path / "node1" / "cpulist", "4-7")
+    write(tmp_path / "possible", "0-1")
+
+    assert numa_nodes(str(tmp_path), cpus=[2, 3, 4, 5]) == {0: [2, 3], 1: [4, 5]}
+    assert numa_nodes(str(tmp_path), cpus=[5]) == {1: [5]}
+    assert numa_nodes(str(tmp_path / "missing"), cpus=[1, 0]) == {0: [0, 1]}
+
+
+def test_pinning_plan_fills_one_node_first(tmp_path):
+    write(tmp_path / "node0" / "cpulist", "0,2")
+    write(tmp_path / "node1" / "cpulist", "1,3")
+
+    assert pinning_plan(3, str(tmp_path), cpus=range(4)) == [0, 2, 1]
+    assert pinning_plan(5, str(tmp_path), cpus=range(4)) == [0, 2, 1, 3, 0]
+
+
+@pytest.mark.skipif(not hasattr(os, "sched_setaffinity"), reason="no sched_setaffinity")
+def test_pinned_pool_workers_run_on_planned_core():
+    with make_process_pool(1, pin=True) as executor:
+        affinity = executor.submit(os.sched_getaffinity, 0).result()
+
+    assert affinity == {pinning_plan(1)[0]}
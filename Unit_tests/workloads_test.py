@@ -0,0 +1,182 @@
+import json
+import asyncio
+import argparse
+from itertools import islice
+
+import pytest
+
+from workloads import (Task, add_workload_arguments, diurnal_period, generate_workload, replay_trace, uniform_workload,
+                       wait_summary, workload_from_args)
+
+
+@pytest.mark.parametrize("arrivals", ["poisson", "bursty", "diurnal"])
+def test_same_seed_same_workload(arrivals):
+    first = list(generate_workload(50, arrivals, seed=7))
+    second = list(generate_workload(50, arrivals, seed=7))
+
+    assert first == second
+    assert [task.task_id for task in first] == list(range(50))
+    assert all(b.arrival >= a.arrival for a, b in zip(first, first[1:]))
+
+
+def test_poisson_mean_rate():
+    tasks = list(generate_workload(5000, "poisson", rate=4.0, seed=1))
+
+    assert tasks[-1].arrival / len(tasks) == pytest.approx(0.25, rel=0.1)
+
+
+def test_bursty_arrivals_cluster():
+    tasks = list(generate_workload(2000, "bursty", rate=2.0, seed=3))
+    gaps = [b.arrival - a.arrival for a, b in zip(tasks, tasks[1:])]
+
+    # Внутри пачек интервалы на порядки меньше среднего
+    assert sum(gap < 0.05 for gap in gaps) > len(gaps) / 2
+
+
+def test_diurnal_peak_is_busier_than_night():
+    tasks = list(generate_workload(2000, "diurnal", rate=1.0, seed=5,
+                                   arrival_options={"peak_factor": 4.0, "period": 1000.0}))
+    night = sum(task.arrival % 1000 < 100 for task in tasks)
+    peak = sum(450 <= task.arrival % 1000 < 550 for task in tasks)
+
+    assert peak > 2 * night
+
+
+def test_cli_diurnal_workload_spans_a_full_cycle():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int)
+    add_workload_arguments(parser)
+
+    tasks = list(workload_from_args(parser.parse_args(["--workload", "diurnal", "--tasks", "400", "--seed", "3"])))
+    period = diurnal_period(400, 2.0)
+    night = sum(task.arrival % period < period / 10 for task in tasks)
+    peak = sum(0.45 * period <= task.arrival % period < 0.55 * period for task in tasks)
+
+    assert peak > 2 * night
+    # Сутки по умолчанию generate_workload: весь прогон укладывается в начало ночи
+    day = workload_from_args(parser.parse_args(["--workload", "diurnal", "--tasks", "400", "--period", "86400"]))
+    assert max(task.arrival for task in day) < 86400 / 20
+
+
+def test_pareto_durations_heavy_tailed_and_capped():
+    durations = [task.duration for task in generate_workload(5000, durations="pareto", seed=2,
+                                                              duration_options={"cap": 30.0})]
+    durations.sort()
+
+    assert min(durations) >= 0.2
+    assert max(durations) <= 30.0
+    assert durations[-1] > 20 * durations[len(durations) // 2]
+
+
+def test_io_fraction_mix():
+    kinds = [task.kind for task in generate_workload(2000, io_fraction=0.75, seed=4)]
+
+    assert set(kinds) == {"io", "cpu"}
+    assert kinds.count("io") / len(kinds) == pytest.approx(0.75, abs=0.05)
+
+
+def test_uniform_workload_matches_old_behaviour():
+    tasks = list(uniform_workload(20, seed=0))
+
+    assert len(tasks) == 20
+    assert all(task.arrival == 0.0 and task.kind == "io" and 0.5 <= task.duration <= 1.5 for task in tasks)
+
+
+def test_generator_is_lazy():
+    tasks = generate_workload(None, seed=0)
+
+    assert len(list(islice(tasks, 3))) == 3
+
+
+def test_replay_csv_keeps_inter_arrival_times(tmp_path):
+    trace = tmp_path / "jobs.csv"
+    trace.write_text(
+        "task_id,submit_time,duration,kind\n"
+        "10,2024-05-01T10:00:00,3.5,io\n"
+        "11,2024-05-01T10:00:02,1.0,cpu\n"
+        "12,2024-05-01T10:00:07.5,0.5,\n"
+    )
+
+    tasks = list(replay_trace(trace))
+
+    assert tasks == [Task(10, 3.5, 0.0, "io"), Task(11, 1.0, 2.0, "cpu"), Task(12, 0.5, 7.5, "io")]
+
+
+def test_replay_jsonl_with_time_scale(tmp_path):
+    trace = tmp_path / "jobs.jsonl"
+    trace.write_text("\n".join(json.dumps(row) for row in [
+        {"submit_time": 1000.0, "duration": 10},
+        {"submit_time": 1004.0, "duration": 20, "kind": "cpu"},
+    ]) + "\n")
+
+    tasks = list(replay_trace(trace, time_scale=0.1))
+
+    assert tasks == [Task(0, 1.0, 0.0, "io"), Task(1, 2.0, pytest.approx(0.4), "cpu")]
+
+
+def test_replay_reports_bad_record(tmp_path):
+    trace = tmp_path / "jobs.csv"
+    trace.write_text("submit_time,duration\n0,1\n5,oops\n")
+
+    with pytest.raises(ValueError, match="record 2"):
+        list(replay_trace(trace))
+
+
+def test_replay_rejects_out_of_order_records(tmp_path):
+    trace = tmp_path / "jobs.csv"
+    trace.write_text("submit_time,duration\n10,1\n12,1\n11,1\n")
+
+    with pytest.raises(ValueError, match="record 3 was submitted before record 2"):
+        list(replay_trace(trace))
+
+
+def test_trace_replayed_in_full_unless_tasks_given(tmp_path):
+    trace = tmp_path / "jobs.csv"
+    trace.write_text("submit_time,duration\n" + "".join(f"{i},1\n" for i in range(50)))
+    args = argparse.Namespace(trace=str(trace), time_scale=1.0, tasks=None)
+
+    assert len(list(workload_from_args(args))) == 50
+    args.tasks = 3
+    assert len(list(workload_from_args(args))) == 3
+
+
+def test_wait_summary():
+    summary = wait_summary([(i, float(i), 1.0) for i in range(20)])
+
+    assert summary["tasks"] == 20
+    assert summary["mean_wait"] == pytest.approx(9.5)
+    assert summary["p95_wait"] == 19.0
+    assert summary["max_wait"] == 19.0
+
+
+def test_threading_runner_respects_arrivals(capsys):
+    from CIagents import run_workload_simulation
+    workload = [Task(0, 0.05, 0.0), Task(1, 0.05, 0.3), Task(2, 0.0, 0.3, "cpu")]
+
+    total_time = run_workload_simulation(iter(workload), agents=2)
+
+    assert total_time >= 0.3
+    assert "Queue wait over 3 tasks" in capsys.readouterr().out
+
+
+def test_asyncio_runner_respects_arrivals(capsys):
+    from CIagentsAIO import run_asyncio_workload_simulation
+    workload = [Task(0, 0.05, 0.0), Task(1, 0.05, 0.3), Task(2, 0.0, 0.3, "cpu")]
+
+    total_time = asyncio.run(run_asyncio_workload_simulation(iter(workload), agents=2))
+
+    assert total_time >= 0.3
+    assert "Queue wait over 3 tasks" in capsys.readouterr().out
+
+
+def test_runners_stop_agents_on_broken_trace(tmp_path):
+    from CIagents import run_workload_simulation
+    from CIagentsAIO import run_asyncio_workload_simulation
+    trace = tmp_path / "jobs.csv"
+    trace.write_text("submit_time,duration\n0,0.01\n0.1,0.01\n0.05,0.01\n")
+
+    # Ошибка в середине трейса должна дойти до вызывающего, а не оставить агентов ждать очередь
+    with pytest.raises(ValueError, match="submitted before"):
+        run_workload_simulation(replay_trace(trace), agents=2)
+    with pytest.raises(ValueError, match="submitted before"):
+        asyncio.run(run_asyncio_workload_simulation(replay_trace(trace), agents=2))
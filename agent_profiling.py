@@ -0,0 +1,232 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+SAMPLE_INTERVAL = 0.005
+# С 3.12 cProfile работает через sys.monitoring: активен только один профилировщик на интерпретатор,
+# зато он видит вызовы во всех потоках. До 3.12 cProfile видит только поток, где его включили
+SHARED_CPROFILE = sys.version_info >= (3, 12)
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+
+def _current_asyncio_task():
+    try:
+        return asyncio.current_task()
+    except RuntimeError:
+        return None
+
+
+def _frame_key(frame):
+    code = frame.f_code
+    return code.co_name, os.path.basename(code.co_filename), code.co_firstlineno
+
+
+def _stack(frame):
+    # От корня к листу: так стеки пишутся и в collapsed-формат, и в speedscope
+    stack = []
+    while frame is not None:
+        stack.append(_frame_key(frame))
+        frame = frame.f_back
+    stack.reverse()
+    return tuple(stack)
+
+
+class Profiler:
+    # Профилировщик прогона агентов. mode='sampling' — фоновый поток раз в interval снимает стеки
+    # всех потоков и помечает их тегом (agent_id, task_id) из profiler.tag(); mode='cprofile' —
+    # детерминированный cProfile в каждом потоке, где вызывался tag() (на 3.12+ — один общий cProfile,
+    # включаемый первым tag() и видящий все потоки). Пока профилировщик не передан в раннер
+    # (profiler=None), агенты его не касаются вовсе
+    def __init__(self, mode='sampling', interval=SAMPLE_INTERVAL):
+        if mode not in ('sampling', 'cprofile'):
+            raise ValueError(f"Unknown profiling mode: {mode}")
+        self.mode = mode
+        self.interval = interval
+        self.samples = Counter()
+        self._thread_tags = {}
+        self._task_tags = {}
+        self._loops = {}
+        self._profiles = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler = None
+        self.elapsed = 0.0
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def start(self):
+        self._started = time.perf_counter()
+        if self.mode == 'sampling':
+            self._stop.clear()
+            self._sampler = threading.Thread(target=self._sample_loop, name='agent-profiler', daemon=True)
+            self._sampler.start()
+
+    def stop(self):
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+            self._sampler = None
+        for profile in self._profiles.values():
+            profile.disable()
+        self.elapsed = time.perf_counter() - self._started
+
+    @contextmanager
+    def tag(self, agent_id, task_id=None):
+        key = (agent_id, task_id)
+        thread_id = threading.get_ident()
+        task = _current_asyncio_task()
+        if self.mode == 'cprofile':
+            # Ключ — объект потока, а не ident: ident завершившегося потока может достаться новому
+            self._enable_cprofile(None if SHARED_CPROFILE else threading.current_thread())
+        if task is not None:
+            # В asyncio все агенты живут в одном потоке: тег вешаем на задачу,
+            # а сэмплер смотрит, какая задача цикла выполняется в момент снимка
+            self._loops[thread_id] = task.get_loop()
+            self._task_tags[task] = key
+            try:
+                yield
+            finally:
+                self._task_tags.pop(task, None)
+        else:
+            previous = self._thread_tags.get(thread_id)
+            self._thread_tags[thread_id] = key
+            try:
+                yield
+            finally:
+                self._thread_tags[thread_id] = previous
+
+    def _enable_cprofile(self, key):
+        with self._lock:
+            if key in self._profiles:
+                return
+            import cProfile
+            self._profiles[key] = profile = cProfile.Profile()
+            profile.enable()
+
+    def _tag_for(self, thread_id):
+        loop = self._loops.get(thread_id)
+        if loop is not None:
+            task = getattr(asyncio.tasks, '_current_tasks', {}).get(loop)
+            if task is not None and task in self._task_tags:
+                return self._task_tags[task]
+        return self._thread_tags.get(thread_id)
+
+    def _sample_loop(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_id:
+                    self.samples[(self._tag_for(thread_id), _stack(frame))] += 1
+
+    def merge(self, tag, samples):
+        # Сэмплы из дочерних процессов (sample_call) под тегом задачи
+        for stack, count in samples.items():
+            self.samples[(tag, stack)] += count
+
+    def collapsed(self):
+        # Формат collapsed stacks (flamegraph.pl, speedscope, inferno): "agent-1;task-3;f;g 12"
+        lines = []
+        for (tag, stack), count in sorted(self.samples.items(), key=lambda item: -item[1]):
+            frames = [f"{name} ({filename}:{line})" for name, filename, line in stack]
+            lines.append(';'.join(_tag_frames(tag) + frames) + f' {count}')
+        return '\n'.join(lines) + '\n'
+
+    def speedscope(self):
+        # Отдельный профиль на агента, в каждом сэмпле корневой кадр — task-N
+        frames, frame_index = [], {}
+
+        def index(frame):
+            if frame not in frame_index:
+                frame_index[frame] = len(frames)
+                name, filename, line = frame
+                frames.append({'name': name, 'file': filename, 'line': line} if filename else {'name': name})
+            return frame_index[frame]
+
+        by_agent = {}
+        for (tag, stack), count in self.samples.items():
+            agent_id, task_id = tag if tag else (None, None)
+            profile = by_agent.setdefault(agent_id, {'samples': [], 'weights': []})
+            root = [index((f"task-{task_id}", None, None))] if task_id is not None else []
+            profile['samples'].append(root + [index(frame) for frame in stack])
+            profile['weights'].append(count * self.interval)
+
+        profiles = []
+        for agent_id, profile in sorted(by_agent.items(), key=lambda item: str(item[0])):
+            profiles.append({
+                'type': 'sampled',
+                'name': f"agent-{agent_id}" if agent_id is not None else 'untagged',
+                'unit': 'seconds',
+                'startValue': 0,
+                'endValue': sum(profile['weights']),
+                'samples': profile['samples'],
+                'weights': profile['weights'],
+            })
+        return {'$schema': SPEEDSCOPE_SCHEMA, 'shared': {'frames': frames}, 'profiles': profiles,
+                'name': 'CI agents', 'exporter': 'agent_profiling'}
+
+    def stats(self):
+        import pstats
+        profiles = list(self._profiles.values())
+        if not profiles:
+            return None
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        return stats
+
+    def export(self, path):
+        # Формат по расширению: .pstats (cprofile), .json (speedscope), иначе collapsed
+        if self.mode == 'cprofile':
+            check_output(self.mode, path)
+            stats = self.stats()
+            if stats is None:
+                raise RuntimeError("cProfile collected nothing: no agent thread or asyncio task ran under tag()")
+            stats.dump_stats(path)
+        elif path.endswith('.json'):
+            with open(path, 'w') as f:
+                json.dump(self.speedscope(), f)
+        else:
+            with open(path, 'w') as f:
+                f.write(self.collapsed())
+
+
+def output_path(prefix, mode, path=None):
+    # Расширение по умолчанию следует из режима: cProfile пишет marshal-pstats, сэмплер — speedscope
+    if path is None:
+        return f"{prefix}.pstats" if mode == 'cprofile' else f"{prefix}.speedscope.json"
+    check_output(mode, path)
+    return path
+
+
+def check_output(mode, path):
+    if mode == 'cprofile' and path.endswith('.json'):
+        raise ValueError(f"cprofile writes binary pstats, not JSON: {path}")
+
+
+def _tag_frames(tag):
+    if not tag:
+        return ['untagged']
+    agent_id, task_id = tag
+    return [f"agent-{agent_id}"] + ([f"task-{task_id}"] if task_id is not None else [])
+
+
+def sample_call(func, *args, interval=SAMPLE_INTERVAL):
+    # Для ProcessPoolExecutor: функция выполняется под сэмплером в дочернем процессе,
+    # наружу уходят результат и Counter стеков (всё сериализуется pickle)
+    profiler = Profiler('sampling', interval)
+    with profiler:
+        result = func(*args)
+    samples = Counter()
+    for (tag, stack), count in profiler.samples.items():
+        samples[stack] += count
+    return result, samples
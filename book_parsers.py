@@ -0,0 +1,230 @@
+import re
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urljoin
+
+PAGES_RE = re.compile(r'Page\s+\d+\s+of\s+(\d+)')
+FIXTURES = Path(__file__).parent / "Unit_tests" / "fixtures" / "books"
+
+# Все бэкенды принимают тело ответа как bytes или итератор чанков bytes (response.iter_content)
+# и возвращают одинаковые структуры:
+#   parse_listing -> (books, next_url, total_pages), где books — [{'title', 'price', 'url'}]
+#   parse_product -> {'availability', 'upc'}
+
+
+def _join_chunks(chunks):
+    if isinstance(chunks, (bytes, bytearray, str)):
+        return chunks
+    return b''.join(chunks)
+
+
+def _total_pages(text):
+    match = PAGES_RE.search(text) if text else None
+    return int(match.group(1)) if match else None
+
+
+def _squash(text):
+    return ' '.join(text.split())
+
+
+class Bs4Parser:
+    name = 'bs4'
+
+    def __init__(self):
+        from bs4 import BeautifulSoup
+        self._soup = lambda html: BeautifulSoup(_join_chunks(html), 'html.parser')
+
+    def parse_listing(self, html, page_url):
+        soup = self._soup(html)
+        books = []
+        for item in soup.find_all('article', class_='product_pod'):
+            link = item.find('h3').find('a')
+            price = item.find('p', class_='price_color').text
+            books.append({'title': link['title'], 'price': price, 'url': urljoin(page_url, link['href'])})
+
+        next_link = soup.select_one('li.next a')
+        next_url = urljoin(page_url, next_link['href']) if next_link else None
+        current = soup.select_one('li.current')
+        return books, next_url, _total_pages(current.text if current else None)
+
+    def parse_product(self, html):
+        soup = self._soup(html)
+        product = {}
+        availability = soup.select_one('.product_main .availability')
+        if availability:
+            product['availability'] = _squash(availability.text)
+        for row in soup.select('table tr'):
+            if row.th and row.th.text == 'UPC':
+                product['upc'] = row.td.text
+        return product
+
+
+class LxmlParser:
+    name = 'lxml'
+
+    def __init__(self):
+        import lxml.html
+        self._fromstring = lxml.html.fromstring
+
+    def parse_listing(self, html, page_url):
+        doc = self._fromstring(_join_chunks(html))
+        books = []
+        for item in doc.find_class('product_pod'):
+            link = item.find('.//h3/a')
+            price = item.find_class('price_color')[0].text_content()
+            books.append({'title': link.get('title'), 'price': price, 'url': urljoin(page_url, link.get('href'))})
+
+        next_links = doc.xpath('//li[@class="next"]/a/@href')
+        next_url = urljoin(page_url, next_links[0]) if next_links else None
+        current = doc.find_class('current')
+        return books, next_url, _total_pages(current[0].text_content() if current else None)
+
+    def parse_product(self, html):
+        doc = self._fromstring(_join_chunks(html))
+        product = {}
+        availability = doc.xpath('//*[contains(@class, "product_main")]//*[contains(@class, "availability")]')
+        if availability:
+            product['availability'] = _squash(availability[0].text_content())
+        upc = doc.xpath('//table//tr[th="UPC"]/td/text()')
+        if upc:
+            product['upc'] = upc[0]
+        return product
+
+
+class SelectolaxParser:
+    name = 'selectolax'
+
+    def __init__(self):
+        try:
+            from selectolax.lexbor import LexborHTMLParser as HTMLParser
+        except ImportError:
+            from selectolax.parser import HTMLParser
+        self._parse = HTMLParser
+
+    def parse_listing(self, html, page_url):
+        tree = self._parse(_join_chunks(html))
+        books = []
+        for item in tree.css('article.product_pod'):
+            link = item.css_first('h3 a')
+            price = item.css_first('p.price_color').text()
+            books.append({'title': link.attributes['title'], 'price': price,
+                          'url': urljoin(page_url, link.attributes['href'])})
+
+        next_link = tree.css_first('li.next a')
+        next_url = urljoin(page_url, next_link.attributes['href']) if next_link else None
+        current = tree.css_first('li.current')
+        return books, next_url, _total_pages(current.text() if current else None)
+
+    def parse_product(self, html):
+        tree = self._parse(_join_chunks(html))
+        product = {}
+        availability = tree.css_first('.product_main .availability')
+        if availability:
+            product['availability'] = _squash(availability.text())
+        for row in tree.css('table tr'):
+            th = row.css_first('th')
+            if th and th.text() == 'UPC':
+                product['upc'] = row.css_first('td').text()
+        return product
+
+
+class StreamParser:
+    # Инкрементальный разбор: чанки байтов идут в lxml HTMLPullParser по мере загрузки,
+    # записи забираются на закрывающем теге, а разобранные элементы сразу освобождаются
+    name = 'stream'
+
+    def __init__(self):
+        from lxml import etree
+        self._etree = etree
+
+    def _events(self, chunks):
+        parser = self._etree.HTMLPullParser(events=('end',))
+        if isinstance(chunks, (bytes, bytearray)):
+            chunks = (chunks,)
+        for chunk in chunks:
+            parser.feed(chunk)
+            yield from parser.read_events()
+        parser.close()
+        yield from parser.read_events()
+
+    @staticmethod
+    def _classes(el):
+        return el.get('class', '').split()
+
+    @staticmethod
+    def _release(el):
+        el.clear(keep_tail=True)
+        parent = el.getparent()
+        while parent is not None and el.getprevious() is not None:
+            del parent[0]
+
+    def parse_listing(self, chunks, page_url):
+        books = []
+        next_url = total_pages = None
+        for _, el in self._events(chunks):
+            if el.tag == 'article' and 'product_pod' in self._classes(el):
+                link = el.find('.//h3/a')
+                price = next(p for p in el.iter('p') if 'price_color' in self._classes(p))
+                books.append({'title': link.get('title'), 'price': price.text,
+                              'url': urljoin(page_url, link.get('href'))})
+                self._release(el)
+            elif el.tag == 'li':
+                classes = self._classes(el)
+                if 'next' in classes and el.find('a') is not None:
+                    next_url = urljoin(page_url, el.find('a').get('href'))
+                elif 'current' in classes:
+                    total_pages = _total_pages(el.text)
+        return books, next_url, total_pages
+
+    def parse_product(self, chunks):
+        product = {}
+        for _, el in self._events(chunks):
+            if (el.tag == 'p' and 'availability' in self._classes(el) and 'availability' not in product
+                    and any('product_main' in self._classes(a) for a in el.iterancestors('div'))):
+                product['availability'] = _squash(''.join(el.itertext()))
+            elif el.tag == 'tr' and el.findtext('th') == 'UPC':
+                product['upc'] = el.findtext('td')
+        return product
+
+
+BACKENDS = {cls.name: cls for cls in (SelectolaxParser, LxmlParser, StreamParser, Bs4Parser)}
+
+
+def get_parser(name='auto'):
+    # auto — самый быстрый из установленных
+    if name != 'auto':
+        return BACKENDS[name]()
+    for cls in BACKENDS.values():
+        try:
+            return cls()
+        except ImportError:
+            continue
+    raise ImportError("No HTML parsing backend available")
+
+
+def _benchmark(rounds=200):
+    pages = [(path, path.read_bytes()) for path in sorted(FIXTURES.rglob('*.html'))]
+    listings = [(p, body) for p, body in pages if b'product_pod' in body]
+    products = [(p, body) for p, body in pages if b'product_page' in body]
+    print(f"Parsing {len(listings)} listing and {len(products)} product fixture pages x {rounds}")
+
+    for name, cls in BACKENDS.items():
+        try:
+            parser = cls()
+        except ImportError:
+            print(f"{name:>10}: not installed")
+            continue
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for path, body in listings:
+                parser.parse_listing(body, 'http://books.toscrape.com/')
+            for path, body in products:
+                parser.parse_product(body)
+        elapsed = time.perf_counter() - start
+        pages_per_sec = rounds * (len(listings) + len(products)) / elapsed
+        print(f"{name:>10}: {elapsed:.3f}s ({pages_per_sec:,.0f} pages/s)")
+
+
+if __name__ == "__main__":
+    _benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
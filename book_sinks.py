@@ -0,0 +1,124 @@
+import re
+import csv
+import json
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from contextlib import contextmanager
+
+FIELDS = ('title', 'price', 'currency', 'in_stock', 'availability', 'upc', 'url')
+HEADERS = {'title': 'Название', 'price': 'Цена', 'currency': 'Валюта', 'in_stock': 'В наличии',
+           'availability': 'Наличие', 'upc': 'UPC', 'url': 'Ссылка'}
+CURRENCIES = {'£': 'GBP', '$': 'USD', '€': 'EUR'}
+PRICE_RE = re.compile(r'(?P<symbol>[^\d.\s-]*)\s*(?P<amount>-?\d+(?:\.\d+)?)')
+STOCK_RE = re.compile(r'\((\d+) available\)')
+PARQUET_BATCH = 1000
+
+
+def normalize_book(book):
+    # '£51.77' -> Decimal('51.77') + 'GBP', 'In stock (22 available)' -> 22
+    record = dict.fromkeys(FIELDS)
+    record.update((k, v) for k, v in book.items() if k in record)
+    match = PRICE_RE.search(book.get('price') or '')
+    if match:
+        try:
+            record['price'] = Decimal(match.group('amount'))
+        except InvalidOperation:
+            record['price'] = None
+        symbol = match.group('symbol').replace('Â', '')
+        record['currency'] = CURRENCIES.get(symbol, symbol or None)
+    else:
+        record['price'] = None
+    stock = STOCK_RE.search(book.get('availability') or '')
+    record['in_stock'] = int(stock.group(1)) if stock else None
+    return record
+
+
+class CsvSink:
+    def __init__(self, path):
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow([HEADERS[f] for f in FIELDS])
+
+    def write(self, record):
+        self._writer.writerow(['' if record[f] is None else record[f] for f in FIELDS])
+
+    def close(self):
+        self._file.close()
+
+
+class NdjsonSink:
+    def __init__(self, path):
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def write(self, record):
+        # Decimal пишем строкой, чтобы не терять точность через float
+        self._file.write(json.dumps(record, ensure_ascii=False, default=str))
+        self._file.write('\n')
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetSink:
+    def __init__(self, path, batch_size=PARQUET_BATCH):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self._pa = pa
+        self._schema = pa.schema([
+            ('title', pa.string()),
+            ('price', pa.decimal128(12, 2)),
+            ('currency', pa.string()),
+            ('in_stock', pa.int32()),
+            ('availability', pa.string()),
+            ('upc', pa.string()),
+            ('url', pa.string()),
+        ])
+        self._writer = pq.ParquetWriter(path, self._schema)
+        self._batch_size = batch_size
+        self._rows = []
+
+    def write(self, record):
+        self._rows.append(record)
+        if len(self._rows) >= self._batch_size:
+            self._flush()
+
+    def _flush(self):
+        if self._rows:
+            self._writer.write_table(self._pa.Table.from_pylist(self._rows, schema=self._schema))
+            self._rows = []
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+
+class ExcelSink:
+    def __init__(self, path):
+        from openpyxl import Workbook
+        # write_only: строки уходят в поток на диск, книга целиком в памяти не строится
+        self._path = path
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet()
+        self._sheet.append([HEADERS[f] for f in FIELDS])
+
+    def write(self, record):
+        self._sheet.append([record[f] for f in FIELDS])
+
+    def close(self):
+        self._workbook.save(self._path)
+
+
+SINKS = {'.csv': CsvSink, '.ndjson': NdjsonSink, '.jsonl': NdjsonSink, '.parquet': ParquetSink, '.xlsx': ExcelSink}
+
+
+@contextmanager
+def open_sink(path, format=None):
+    # with open_sink('books.parquet') as sink: sink.write(normalize_book(book))
+    suffix = f'.{format}' if format else Path(path).suffix.lower()
+    if suffix not in SINKS:
+        raise ValueError(f"Unsupported output format: {suffix}")
+    sink = SINKS[suffix](path)
+    try:
+        yield sink
+    finally:
+        sink.close()
@@ -0,0 +1,35 @@
+import sys
+import importlib
+
+# Подкоманда -> (модуль, функция main(argv)). Модуль импортируется только при вызове своей подкоманды,
+# поэтому сам cli не импортирует ничего тяжелее importlib
+SUBCOMMANDS = {
+    'agents': ('CIagents', 'main'),
+    'agents-async': ('CIagentsAIO', 'main'),
+    'lock': ('DevOps3.pidlock_run', 'main'),
+    'timestamps': ('timestamp_cheat', 'main'),
+    'scrape': ('htmlparser', 'main'),
+    'bench-startup': ('startup_budget', 'main'),
+}
+
+USAGE = "usage: cli.py {" + ",".join(SUBCOMMANDS) + "} [args...]"
+
+
+def resolve(name):
+    module_name, func_name = SUBCOMMANDS[name]
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ('-h', '--help'):
+        print(USAGE)
+        return 0 if argv else 2
+    if argv[0] not in SUBCOMMANDS:
+        print(f"Unknown command: {argv[0]}\n{USAGE}", file=sys.stderr)
+        return 2
+    return resolve(argv[0])(argv[1:])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
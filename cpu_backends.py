@@ -0,0 +1,171 @@
+import sys
+import time
+import sysconfig
+
+from CIagents import N_AGENT, NUM_TASKS, cpu_intensive_pipeline_step
+
+# Бэкенды для cpu_intensive_pipeline_step. У всех одинаковый интерфейс:
+#   with get_backend('auto', workers) as backend:
+#       elapsed = backend.map(task_ids)   # список времён выполнения шагов, в порядке task_ids
+
+
+def is_free_threaded():
+    # Сборка CPython без GIL (PEP 703) и GIL реально выключен в этом процессе
+    if not sysconfig.get_config_var('Py_GIL_DISABLED'):
+        return False
+    return not getattr(sys, '_is_gil_enabled', lambda: True)()
+
+
+def _interpreter_pool_executor():
+    # PEP 734: concurrent.futures.InterpreterPoolExecutor, Python 3.14+
+    try:
+        from concurrent.futures import InterpreterPoolExecutor
+    except ImportError:
+        return None
+    return InterpreterPoolExecutor
+
+
+def _has_numpy():
+    try:
+        import numpy
+    except ImportError:
+        return False
+    return True
+
+
+class _ExecutorBackend:
+    name = None
+
+    def __init__(self, workers=N_AGENT):
+        self.workers = workers
+        self._executor = None
+
+    def _make_executor(self):
+        raise NotImplementedError
+
+    def __enter__(self):
+        self._executor = self._make_executor()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._executor.shutdown()
+        self._executor = None
+
+    def map(self, task_ids):
+        return list(self._executor.map(cpu_intensive_pipeline_step, task_ids))
+
+
+class ProcessBackend(_ExecutorBackend):
+    name = 'processes'
+
+    @staticmethod
+    def available():
+        return True
+
+    def _make_executor(self):
+        from worker_sizing import make_process_pool
+        return make_process_pool(self.workers)
+
+
+class ThreadBackend(_ExecutorBackend):
+    # С GIL потоки на CPU-задаче не дают параллелизма, поэтому auto выбирает их только без GIL
+    name = 'threads'
+
+    @staticmethod
+    def available():
+        return True
+
+    def _make_executor(self):
+        from concurrent.futures import ThreadPoolExecutor
+        return ThreadPoolExecutor(max_workers=self.workers)
+
+
+class SubinterpreterBackend(_ExecutorBackend):
+    # Отдельный GIL на интерпретатор (PEP 684/734): параллелизм без порождения процессов
+    name = 'subinterpreters'
+
+    @staticmethod
+    def available():
+        return _interpreter_pool_executor() is not None
+
+    def _make_executor(self):
+        return _interpreter_pool_executor()(max_workers=self.workers)
+
+
+def numpy_primes(limit):
+    import numpy as np
+    sieve = np.ones(max(limit, 2), dtype=bool)
+    sieve[:2] = False
+    for i in range(2, int(limit ** 0.5) + 1):
+        if sieve[i]:
+            sieve[i * i::i] = False
+    return np.flatnonzero(sieve[:limit])
+
+
+def numpy_pipeline_step(task_id):
+    # Тот же размер задачи, что и в cpu_intensive_pipeline_step, но решето вместо перебора делителей
+    start_time = time.perf_counter()
+    target_range = 1000 + (task_id % 100) * 50
+    numpy_primes(target_range)
+    return time.perf_counter() - start_time
+
+
+class NumpyBackend:
+    name = 'numpy'
+
+    def __init__(self, workers=N_AGENT):
+        self.workers = workers
+
+    @staticmethod
+    def available():
+        return _has_numpy()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    def map(self, task_ids):
+        return [numpy_pipeline_step(task_id) for task_id in task_ids]
+
+
+BACKENDS = {cls.name: cls for cls in (ProcessBackend, ThreadBackend, SubinterpreterBackend, NumpyBackend)}
+
+
+def available_backends():
+    return [name for name, cls in BACKENDS.items() if cls.available()]
+
+
+def select_backend():
+    # Без GIL — потоки (нет ни порождения процессов, ни pickle), затем субинтерпретаторы, иначе процессы
+    if is_free_threaded():
+        return 'threads'
+    if SubinterpreterBackend.available():
+        return 'subinterpreters'
+    return 'processes'
+
+
+def get_backend(name='auto', workers=N_AGENT):
+    if name == 'auto':
+        name = select_backend()
+    cls = BACKENDS[name]
+    if not cls.available():
+        raise RuntimeError(f"CPU backend '{name}' is not available in this interpreter")
+    return cls(workers)
+
+
+def _benchmark(num_tasks=NUM_TASKS * 5, workers=N_AGENT):
+    task_ids = list(range(num_tasks))
+    print(f"{num_tasks} pipeline steps, {workers} workers, auto -> {select_backend()}")
+    for name in available_backends():
+        start = time.perf_counter()
+        with get_backend(name, workers) as backend:
+            results = backend.map(task_ids)
+        elapsed = time.perf_counter() - start
+        assert len(results) == num_tasks
+        print(f"{name:>16}: {elapsed:.3f}s total, {sum(results):.3f}s in steps")
+
+
+if __name__ == "__main__":
+    _benchmark()
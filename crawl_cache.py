@@ -0,0 +1,124 @@
+import os
+import json
+import hashlib
+import tempfile
+import threading
+from pathlib import Path
+
+DEFAULT_CACHE_DIR = ".crawl_cache"
+CHUNK_SIZE = 64 * 1024
+STATE_FILE = "outputs.state"
+
+
+class CrawlCache:
+    # Одна JSON-запись на URL: валидаторы HTTP (ETag/Last-Modified), хэш тела и уже разобранный результат.
+    # 304 — тело не качается и не разбирается, берётся сохранённый результат. Без валидаторов страница
+    # разбирается потоком, а совпавший хэш лишь помечает её как неизменившуюся.
+    # Новые записи копятся в памяти и попадают на диск только в commit(), после того как выходной файл
+    # записан: прерванный обход не оставляет кэш «впереди» результата. Поколение кэша растёт с каждым
+    # закоммиченным обходом, где что-то поменялось, и для каждого выходного файла помнится поколение,
+    # из которого он собран
+    def __init__(self, path=DEFAULT_CACHE_DIR):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.not_modified = 0
+        self.unchanged = 0
+        self.changed = 0
+        self._lock = threading.Lock()
+        self._pending = {}
+
+    def _entry_path(self, url):
+        return self.path / (hashlib.sha1(url.encode()).hexdigest() + ".json")
+
+    def get(self, url):
+        try:
+            with open(self._entry_path(url), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def conditional_headers(entry):
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def put(self, url, response, content_hash, parsed):
+        entry = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "content_hash": content_hash,
+            "parsed": parsed,
+        }
+        with self._lock:
+            self._pending[url] = entry
+
+    def _write_json(self, path, data):
+        # Запись через временный файл: параллельные процессы и прерванный запуск не оставят битый JSON
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _state(self):
+        try:
+            with open(self.path / STATE_FILE, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"generation": 0, "outputs": {}}
+
+    def is_current(self, output):
+        # Выходной файл собран из текущего состояния кэша (и с тех пор кэш не менялся)
+        state = self._state()
+        return state["outputs"].get(os.path.abspath(output)) == state["generation"]
+
+    def commit(self, output=None):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for url, entry in pending.items():
+            self._write_json(self._entry_path(url), entry)
+        state = self._state()
+        if self.changed:
+            state["generation"] += 1
+        if output is not None:
+            state["outputs"][os.path.abspath(output)] = state["generation"]
+        self._write_json(self.path / STATE_FILE, state)
+
+    def _count(self, attr):
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+
+    def fetch(self, session, url, parse, *args, timeout=None, chunk_size=CHUNK_SIZE):
+        entry = self.get(url)
+        with session.get(url, headers=self.conditional_headers(entry), timeout=timeout, stream=True) as response:
+            if response.status_code == 304 and entry is not None:
+                self._count("not_modified")
+                return entry["parsed"]
+            response.raise_for_status()
+            # Тело идёт в парсер потоком, хэш считается по тем же чанкам
+            digest = hashlib.sha256()
+            chunks = response.iter_content(chunk_size)
+            parsed = parse(_hashing(chunks, digest), *args)
+            for chunk in chunks:
+                # Парсер мог остановиться раньше конца документа — хвост нужен для хэша
+                digest.update(chunk)
+
+        content_hash = digest.hexdigest()
+        if entry is not None and entry.get("content_hash") == content_hash:
+            # Сервер не поддерживает валидаторы, но страница та же
+            self._count("unchanged")
+            parsed = entry["parsed"]
+        else:
+            self._count("changed")
+        self.put(url, response, content_hash, parsed)
+        return parsed
+
+
+def _hashing(chunks, digest):
+    for chunk in chunks:
+        digest.update(chunk)
+        yield chunk
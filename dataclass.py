@@ -1,6 +1,8 @@
 from dataclasses import dataclass, field
 
-@dataclass
+import numpy as np
+
+@dataclass(slots=True)
 class Service:
     name : str
     replicas : int = 1
@@ -8,13 +10,110 @@ class Service:
 
     def scale (self, delta : int) -> None:
         self.replicas = max(0,self.replicas + delta)
-service_x = Service ("Test1", 3, ["A", "B", "C"])
-#Должен вернуть 2
-service_x.scale(-1)
-print(service_x.replicas)
-#Должен вернуть 0
-service_x.scale(-5)
-print(service_x.replicas)
-service_e=("Test", 2, "string")
-service_e.scale(-1)
-print(service_e.replicas)
\ No newline at end of file
+
+
+class Fleet:
+    # Колоночное хранение: реплики в одном int64-массиве, операции над всем парком без цикла по сервисам
+    def __init__(self, services=()):
+        self._names = []
+        self._index = {}
+        self._containers = []
+        self._replicas = np.zeros(16, dtype=np.int64)
+        self._size = 0
+        self._names_array = None
+        for service in services:
+            self.add(service)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, name) -> bool:
+        return name in self._index
+
+    def __getitem__(self, name : str) -> Service:
+        i = self._index[name]
+        return Service(name, int(self._replicas[i]), list(self._containers[i]))
+
+    def __iter__(self):
+        for i, name in enumerate(self._names):
+            yield Service(name, int(self._replicas[i]), list(self._containers[i]))
+
+    @property
+    def replicas(self) -> np.ndarray:
+        return self._replicas[:self._size]
+
+    @property
+    def names(self) -> np.ndarray:
+        if self._names_array is None:
+            self._names_array = np.array(self._names, dtype=str)
+        return self._names_array
+
+    def add(self, service : Service) -> None:
+        if service.name in self._index:
+            raise ValueError(f"Service {service.name} already in fleet")
+        if self._size == len(self._replicas):
+            self._replicas = np.resize(self._replicas, self._size * 2)
+        self._index[service.name] = self._size
+        self._names.append(service.name)
+        self._containers.append(service.containers)
+        self._replicas[self._size] = max(0, service.replicas)
+        self._size += 1
+        self._names_array = None
+
+    def mask(self, predicate) -> np.ndarray:
+        # predicate: булев массив длины len(fleet) или функция fleet -> булев массив
+        mask = predicate(self) if callable(predicate) else predicate
+        mask = np.asarray(mask, dtype=bool)
+        if mask.shape != (self._size,):
+            raise ValueError(f"Mask shape {mask.shape} does not match fleet size {self._size}")
+        return mask
+
+    def name_startswith(self, prefix : str) -> np.ndarray:
+        return np.char.startswith(self.names, prefix)
+
+    def scale(self, name : str, delta : int) -> None:
+        i = self._index[name]
+        self._replicas[i] = max(0, self._replicas[i] + delta)
+
+    def scale_where(self, predicate, delta : int) -> int:
+        mask = self.mask(predicate)
+        replicas = self.replicas
+        replicas[mask] = np.maximum(replicas[mask] + delta, 0)
+        return int(mask.sum())
+
+    def total_replicas(self) -> int:
+        return int(self.replicas.sum())
+
+    def desired_array(self, desired) -> np.ndarray:
+        # desired: массив в порядке парка или словарь name -> replicas (отсутствующие остаются как есть)
+        if isinstance(desired, dict):
+            target = self.replicas.copy()
+            if desired:
+                idx = np.fromiter((self._index[name] for name in desired), dtype=np.int64, count=len(desired))
+                target[idx] = np.fromiter(desired.values(), dtype=np.int64, count=len(desired))
+            return target
+        target = np.asarray(desired, dtype=np.int64)
+        if target.shape != (self._size,):
+            raise ValueError(f"Desired shape {target.shape} does not match fleet size {self._size}")
+        return target
+
+    def diff(self, desired) -> dict[str, int]:
+        delta = self.desired_array(desired) - self.replicas
+        changed = np.flatnonzero(delta)
+        return {self._names[i]: int(delta[i]) for i in changed}
+
+    def apply(self, desired) -> None:
+        self.replicas[:] = np.maximum(self.desired_array(desired), 0)
+
+
+if __name__ == "__main__":
+    service_x = Service ("Test1", 3, ["A", "B", "C"])
+    #Должен вернуть 2
+    service_x.scale(-1)
+    print(service_x.replicas)
+    #Должен вернуть 0
+    service_x.scale(-5)
+    print(service_x.replicas)
+    service_e=("Test", 2, "string")
+    service_e.scale(-1)
+    print(service_e.replicas)
@@ -1,12 +1,164 @@
+import os
+import re
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
 import requests
-from bs4 import BeautifulSoup
-import pandas as pd
-url = "http://books.toscrape.com/"
-response = requests.get(url)
-soup = BeautifulSoup(response.text, 'html.parser')
-books = []
-for item in soup.find_all('article', class_='product_pod'):
-    title = item.find('h3').find('a')['title']
-    price = item.find('p', class_='price_color').text
-    books.append({'Название': title, 'Цена': price})
-pd.DataFrame(books).to_excel('books.xlsx', index=False)
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from book_parsers import get_parser
+from book_sinks import SINKS, open_sink, normalize_book
+from crawl_cache import CrawlCache, DEFAULT_CACHE_DIR
+
+BASE_URL = "http://books.toscrape.com/"
+MAX_WORKERS = 16          # Одновременных запросов
+REQUESTS_PER_SECOND = 20  # Ограничение вежливости для сайта
+RETRIES = 3
+TIMEOUT = 10
+CHUNK_SIZE = 64 * 1024
+
+PAGE_RE = re.compile(r'page-\d+\.html$')
+
+
+class RateLimiter:
+    # Раздаёт потокам слоты не чаще rate в секунду
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def make_session(pool_size=MAX_WORKERS, retries=RETRIES):
+    # Одна сессия с keep-alive пулом на все потоки, повторы на сетевых ошибках и 429/5xx
+    session = requests.Session()
+    retry = Retry(total=retries, backoff_factor=0.2, status_forcelist=(429, 500, 502, 503, 504))
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def iter_crawl(start_url=BASE_URL, max_workers=MAX_WORKERS, rate=REQUESTS_PER_SECOND, details=True, session=None,
+               parser='auto', cache=None):
+    # Отдаёт ((номер страницы, позиция), книга) сразу, как только запись собрана целиком,
+    # в памяти держатся только книги, ждущие свою страницу товара
+    session = session or make_session(max_workers)
+    limiter = RateLimiter(rate)
+    parser = get_parser(parser) if isinstance(parser, str) else parser
+
+    def fetch(page_url, parse, *args):
+        # Разбор идёт в том же потоке прямо по чанкам тела ответа, без .text:
+        # кодировку парсер берёт из <meta charset>, requests угадывает её неверно
+        limiter.wait()
+        if cache is not None:
+            return cache.fetch(session, page_url, parse, *args, timeout=TIMEOUT, chunk_size=CHUNK_SIZE)
+        with session.get(page_url, timeout=TIMEOUT, stream=True) as response:
+            response.raise_for_status()
+            return parse(response.iter_content(CHUNK_SIZE), *args)
+
+    waiting = {}
+    seen = {start_url}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {executor.submit(fetch, start_url, parser.parse_listing, start_url): ('listing', start_url, 1)}
+
+        def schedule_listing(page_url, page_no):
+            if page_url not in seen:
+                seen.add(page_url)
+                pending[executor.submit(fetch, page_url, parser.parse_listing, page_url)] = \
+                    ('listing', page_url, page_no)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                kind, page_url, key = pending.pop(future)
+                try:
+                    parsed = future.result()
+                except requests.RequestException as e:
+                    print(f"Failed to fetch {page_url}: {e}")
+                    if kind == 'product':
+                        yield key, waiting.pop(key)
+                    continue
+
+                if kind == 'product':
+                    book = waiting.pop(key)
+                    book.update(parsed)
+                    yield key, book
+                    continue
+
+                items, next_url, total_pages = parsed
+                for pos, book in enumerate(items):
+                    if details:
+                        waiting[(key, pos)] = book
+                        pending[executor.submit(fetch, book['url'], parser.parse_product)] = \
+                            ('product', book['url'], (key, pos))
+                    else:
+                        yield (key, pos), book
+                if next_url and key == 1 and total_pages and PAGE_RE.search(next_url):
+                    # Номер последней страницы известен — ставим все страницы каталога в очередь сразу
+                    for page_no in range(2, total_pages + 1):
+                        schedule_listing(PAGE_RE.sub(f'page-{page_no}.html', next_url), page_no)
+                elif next_url:
+                    schedule_listing(next_url, key + 1)
+
+
+def crawl(*args, **kwargs):
+    return [book for _, book in sorted(iter_crawl(*args, **kwargs), key=lambda item: item[0])]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape books.toscrape.com into books.xlsx.")
+    parser.add_argument("--url", default=BASE_URL, help="Catalogue start page")
+    parser.add_argument("-o", "--output", default="books.xlsx",
+                        help="Output file: .xlsx, .csv, .ndjson/.jsonl or .parquet")
+    parser.add_argument("-j", "--workers", type=int, default=MAX_WORKERS, help="Concurrent requests")
+    parser.add_argument("--rate", type=float, default=REQUESTS_PER_SECOND, help="Max requests per second")
+    parser.add_argument("--parser", default="auto", help="HTML parsing backend")
+    parser.add_argument("--no-details", action="store_true", help="Do not fetch product pages")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="HTTP cache for conditional requests")
+    parser.add_argument("--no-cache", action="store_true", help="Always download and parse every page")
+    args = parser.parse_args(argv)
+    suffix = os.path.splitext(args.output)[1].lower()
+    if suffix not in SINKS:
+        parser.error(f"unsupported output format '{suffix or args.output}', use one of: {', '.join(SINKS)}")
+
+    cache = None if args.no_cache else CrawlCache(args.cache_dir)
+    # Записи пишутся по мере разбора во временный файл, готовый файл подменяется в конце
+    part_path = args.output + '.part'
+    try:
+        with open_sink(part_path, suffix.lstrip('.')) as sink:
+            for _, book in iter_crawl(args.url, args.workers, args.rate, not args.no_details,
+                                      parser=args.parser, cache=cache):
+                sink.write(normalize_book(book))
+    except BaseException:
+        # Обрыв обхода (сеть, Ctrl+C) не должен оставлять недописанный .part
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+
+    if cache is not None:
+        print(f"Pages: {cache.changed} changed, {cache.unchanged} unchanged, {cache.not_modified} not modified")
+        if not cache.changed and os.path.exists(args.output) and cache.is_current(args.output):
+            os.remove(part_path)
+            print(f"Nothing changed, keeping '{args.output}'")
+            return
+    os.replace(part_path, args.output)
+    if cache is not None:
+        # Кэш догоняет только записанный результат; обрыв выше оставляет его в прежнем состоянии
+        cache.commit(args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+
+from CIagents import N_AGENT
+
+EPS = 1e-9
+
+
+@dataclass(slots=True, frozen=True)
+class Resources:
+    cpu: float = 0.0  # ядра
+    mem: int = 0      # МиБ
+    io: float = 0.0   # доля дисковой/сетевой полосы агента
+
+    def fits(self, free):
+        return self.cpu <= free.cpu + EPS and self.mem <= free.mem and self.io <= free.io + EPS
+
+    def __add__(self, other):
+        return Resources(self.cpu + other.cpu, self.mem + other.mem, self.io + other.io)
+
+    def __sub__(self, other):
+        return Resources(self.cpu - other.cpu, self.mem - other.mem, self.io - other.io)
+
+
+AGENT_CAPACITY = Resources(cpu=4.0, mem=8192, io=4.0)
+# Требования по типу задачи, если задача не объявила свои (workloads.Task.demand)
+DEFAULT_DEMANDS = {
+    'io': Resources(cpu=0.5, mem=512, io=1.0),
+    'cpu': Resources(cpu=1.0, mem=1024, io=0.25),
+}
+
+
+def demand_for(task):
+    return task.demand or DEFAULT_DEMANDS[task.kind]
+
+
+def default_agents(n=N_AGENT, capacity=AGENT_CAPACITY):
+    return {agent_id: capacity for agent_id in range(n)}
+
+
+class _MaxTree:
+    # Дерево отрезков по свободным ядрам в порядке агентов: самый левый агент с free >= x за O(log n)
+    def __init__(self, values):
+        self.size = 1
+        while self.size < len(values):
+            self.size *= 2
+        self.tree = [float('-inf')] * (2 * self.size)
+        for i, value in enumerate(values):
+            self.tree[self.size + i] = value
+        for i in range(self.size - 1, 0, -1):
+            self.tree[i] = max(self.tree[2 * i], self.tree[2 * i + 1])
+
+    def update(self, i, value):
+        i += self.size
+        self.tree[i] = value
+        while i > 1:
+            i //= 2
+            self.tree[i] = max(self.tree[2 * i], self.tree[2 * i + 1])
+
+    def leftmost(self, need, start=0, node=1, lo=0, hi=None):
+        hi = self.size if hi is None else hi
+        if hi <= start or self.tree[node] < need - EPS:
+            return None
+        if node >= self.size:
+            return node - self.size
+        mid = (lo + hi) // 2
+        found = self.leftmost(need, start, 2 * node, lo, mid)
+        return found if found is not None else self.leftmost(need, start, 2 * node + 1, mid, hi)
+
+
+class Placer:
+    # Упаковка задач на агентов по трём ресурсам; на одном агенте одновременно идут несколько задач.
+    # best_fit — агент с наименьшим подходящим остатком CPU (отсортированный индекс + bisect),
+    # first_fit — первый подходящий агент по порядку (дерево отрезков по свободным ядрам)
+    def __init__(self, agents=None, strategy='best_fit'):
+        if strategy not in ('best_fit', 'first_fit'):
+            raise ValueError(f"Unknown placement strategy: {strategy}")
+        self.strategy = strategy
+        self.capacity = dict(agents or default_agents())
+        self.free = dict(self.capacity)
+        self.running = {agent_id: {} for agent_id in self.capacity}
+        self._where = {}
+        self._order = list(self.capacity)
+        self._by_free = sorted((free.cpu, i) for i, free in enumerate(self.free.values()))
+        self._tree = _MaxTree([free.cpu for free in self.free.values()])
+        self.peak_concurrency = dict.fromkeys(self.capacity, 0)
+
+    def can_ever_fit(self, demand):
+        return any(demand.fits(capacity) for capacity in self.capacity.values())
+
+    def _candidate(self, demand):
+        if self.strategy == 'best_fit':
+            for free_cpu, i in self._by_free[bisect_left(self._by_free, (demand.cpu - EPS, -1)):]:
+                if demand.fits(self.free[self._order[i]]):
+                    return i
+            return None
+        i = self._tree.leftmost(demand.cpu)
+        while i is not None and i < len(self._order):
+            if demand.fits(self.free[self._order[i]]):
+                return i
+            i = self._tree.leftmost(demand.cpu, i + 1)
+        return None
+
+    def _set_free(self, i, free):
+        agent_id = self._order[i]
+        self._by_free.remove((self.free[agent_id].cpu, i))
+        insort(self._by_free, (free.cpu, i))
+        self._tree.update(i, free.cpu)
+        self.free[agent_id] = free
+
+    def place(self, key, demand):
+        # -> agent_id или None, если сейчас места нет. key должен быть уникален среди запущенных задач:
+        # task_id из трейса может повторяться (перезапуски), поэтому раннеры передают номер прихода
+        if key in self._where:
+            raise ValueError(f"Task {key} is already running on agent {self._order[self._where[key]]}")
+        if not self.can_ever_fit(demand):
+            raise ValueError(f"Task {key} needs {demand}, more than any agent has")
+        i = self._candidate(demand)
+        if i is None:
+            return None
+        agent_id = self._order[i]
+        self._set_free(i, self.free[agent_id] - demand)
+        self.running[agent_id][key] = demand
+        self._where[key] = i
+        self.peak_concurrency[agent_id] = max(self.peak_concurrency[agent_id], len(self.running[agent_id]))
+        return agent_id
+
+    def release(self, key):
+        i = self._where.pop(key)
+        agent_id = self._order[i]
+        demand = self.running[agent_id].pop(key)
+        self._set_free(i, self.free[agent_id] + demand)
+        return agent_id
+
+    def fragmentation(self, probe=None):
+        # Фрагментированная ёмкость — свободные ресурсы на агентах, куда задача probe уже не влезает,
+        # хотя суммарно по парку места может хватать
+        probe = probe or min(DEFAULT_DEMANDS.values(), key=lambda r: (r.cpu, r.mem, r.io))
+        total = sum(self.capacity.values(), Resources())
+        free = sum(self.free.values(), Resources())
+        stranded = sum((f for f in self.free.values() if not probe.fits(f)), Resources())
+        return {
+            'utilization': {dim: 1 - getattr(free, dim) / getattr(total, dim) for dim in ('cpu', 'mem', 'io')},
+            'fragmented': {dim: getattr(stranded, dim) / getattr(free, dim) if getattr(free, dim) > EPS else 0.0
+                           for dim in ('cpu', 'mem', 'io')},
+            'fits_probe': sum(probe.fits(f) for f in self.free.values()),
+        }
+
+
+def dominant_share(demand, capacity=AGENT_CAPACITY):
+    return max(demand.cpu / capacity.cpu, demand.mem / capacity.mem, demand.io / capacity.io)
+
+
+def pack(tasks, agents=None, strategy='best_fit'):
+    # Офлайн-упаковка (FFD/BFD): задачи по убыванию доминирующей доли, затем best/first fit.
+    # -> (placer, [(задача, agent_id)], [неразмещённые задачи])
+    placer = Placer(agents, strategy)
+    placement, unplaced = [], []
+    ordered = sorted(enumerate(tasks), key=lambda item: dominant_share(demand_for(item[1])), reverse=True)
+    for key, task in ordered:
+        agent_id = placer.place(key, demand_for(task))
+        if agent_id is None:
+            unplaced.append(task)
+        else:
+            placement.append((task, agent_id))
+    return placer, placement, unplaced
+
+
+def print_placement_report(placer, summary, fragmentation):
+    # fragmentation — снимки Placer.fragmentation(), сделанные, пока в очереди были задачи
+    print(f"Queue wait over {summary['tasks']} tasks: mean {summary['mean_wait']:.2f}s, "
+          f"p95 {summary['p95_wait']:.2f}s, max {summary['max_wait']:.2f}s")
+    print("Peak tasks per agent: " + ', '.join(f"{agent_id}: {peak}" for agent_id, peak in placer.peak_concurrency.items()))
+    if not fragmentation:
+        print("No task ever waited for capacity")
+        return
+    for dim in ('cpu', 'mem', 'io'):
+        used = sum(f['utilization'][dim] for f in fragmentation) / len(fragmentation)
+        stranded = sum(f['fragmented'][dim] for f in fragmentation) / len(fragmentation)
+        print(f"While tasks waited, {dim}: {used:.0%} used, {stranded:.0%} of free capacity fragmented")
@@ -21,10 +21,11 @@ class Service(BaseModel):
             raise ValueError('Container names cannot be empty')
         return v
 
-service_x = Service(name="Test1", containers="A,B")
-print(service_x.containers)
+if __name__ == "__main__":
+    service_x = Service(name="Test1", containers="A,B")
+    print(service_x.containers)
 
-try:
-    Service(name="test", containers=["", "web"])
-except ValueError as e:
-    print(e)
\ No newline at end of file
+    try:
+        Service(name="test", containers=["", "web"])
+    except ValueError as e:
+        print(e)
\ No newline at end of file
@@ -0,0 +1,99 @@
+import json
+import time
+from dataclasses import dataclass, field
+from itertools import islice
+
+from pydantic import TypeAdapter, ValidationError
+
+from pydantic_test import Service
+
+# Один адаптер на весь процесс: схема списка компилируется один раз
+SERVICES_ADAPTER = TypeAdapter(list[Service])
+BATCH_SIZE = 1000
+
+
+@dataclass
+class BatchResult:
+    services: list[Service] = field(default_factory=list)
+    # индекс записи во входных данных -> список ошибок pydantic для неё
+    errors: dict[int, list[dict]] = field(default_factory=dict)
+    indices: list[int] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+def _split_errors(exc: ValidationError) -> dict[int, list[dict]]:
+    errors = {}
+    for error in exc.errors(include_url=False):
+        index, *loc = error['loc']
+        errors.setdefault(index, []).append({**error, 'loc': tuple(loc)})
+    return errors
+
+
+def validate_services(records, offset=0) -> BatchResult:
+    # Быстрый путь: весь список валидируется одним вызовом в pydantic-core.
+    # При ошибках отбрасываем битые записи и перевалидируем остаток ещё одним вызовом
+    records = list(records)
+    try:
+        services = SERVICES_ADAPTER.validate_python(records)
+        return BatchResult(services, {}, list(range(offset, offset + len(records))))
+    except ValidationError as e:
+        errors = _split_errors(e)
+
+    good = [i for i in range(len(records)) if i not in errors]
+    services = SERVICES_ADAPTER.validate_python([records[i] for i in good])
+    return BatchResult(services,
+                       {offset + i: errs for i, errs in errors.items()},
+                       [offset + i for i in good])
+
+
+def validate_services_json(data: bytes) -> BatchResult:
+    # JSON-массив манифестов: парсинг и валидация без промежуточных dict в Python
+    try:
+        services = SERVICES_ADAPTER.validate_json(data)
+        return BatchResult(services, {}, list(range(len(services))))
+    except ValidationError:
+        records = json.loads(data)
+    if not isinstance(records, list):
+        raise ValueError("Expected a JSON array of service manifests")
+    return validate_services(records)
+
+
+def iter_validated(records, batch_size=BATCH_SIZE):
+    # Поток манифестов режется на пачки; каждая пачка — отдельный BatchResult
+    it = iter(records)
+    offset = 0
+    while True:
+        batch = list(islice(it, batch_size))
+        if not batch:
+            return
+        yield validate_services(batch, offset)
+        offset += len(batch)
+
+
+def _benchmark(n=20000):
+    records = [{'name': f'svc-{i}', 'replicas': i % 7, 'containers': f'web-{i}, sidecar'} for i in range(n)]
+    payload = json.dumps(records).encode()
+
+    start = time.perf_counter()
+    [Service(**record) for record in records]
+    per_object = time.perf_counter() - start
+
+    start = time.perf_counter()
+    validate_services(records)
+    batch = time.perf_counter() - start
+
+    start = time.perf_counter()
+    validate_services_json(payload)
+    from_json = time.perf_counter() - start
+
+    print(f"Validating {n} services")
+    print(f"Per-object Service(**record): {per_object:.3f}s ({n / per_object:,.0f}/s)")
+    print(f"TypeAdapter(list[Service]):   {batch:.3f}s ({n / batch:,.0f}/s)")
+    print(f"validate_json(bytes):         {from_json:.3f}s ({n / from_json:,.0f}/s)")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,74 @@
+import json
+from functools import lru_cache
+
+from pydantic import TypeAdapter
+
+from dataclass import Fleet, Service as ServiceData
+from pydantic_test import Service as ServiceModel
+from service_batch import SERVICES_ADAPTER
+
+
+@lru_cache(maxsize=None)
+def serializer_for(cls) -> TypeAdapter:
+    # Схема и сериализатор pydantic-core собираются один раз на тип
+    return TypeAdapter(cls)
+
+
+def to_model(service: ServiceData, validate=False) -> ServiceModel:
+    # Данные из dataclass уже проверены нашим же кодом — по умолчанию без повторной валидации
+    if validate:
+        return ServiceModel(name=service.name, replicas=service.replicas, containers=service.containers)
+    return ServiceModel.model_construct(name=service.name, replicas=service.replicas,
+                                        containers=service.containers)
+
+
+def to_dataclass(model: ServiceModel) -> ServiceData:
+    return ServiceData(model.name, model.replicas, model.containers)
+
+
+def fleet_to_models(fleet: Fleet) -> list[ServiceModel]:
+    construct = ServiceModel.model_construct
+    return [construct(name=s.name, replicas=s.replicas, containers=s.containers) for s in fleet]
+
+
+def models_to_fleet(models) -> Fleet:
+    return Fleet(to_dataclass(model) for model in models)
+
+
+def dump_json(service) -> bytes:
+    return serializer_for(type(service)).dump_json(service)
+
+
+def dump_json_list(models: list[ServiceModel]) -> bytes:
+    return SERVICES_ADAPTER.dump_json(models)
+
+
+def write_ndjson(services, fp) -> int:
+    # fp открыт в бинарном режиме; принимает и pydantic-модели, и dataclass (в т.ч. из Fleet)
+    count = 0
+    for service in services:
+        fp.write(dump_json(service))
+        fp.write(b"\n")
+        count += 1
+    return count
+
+
+def read_ndjson(fp, trusted=False):
+    # trusted=True — файл записан нами же, пропускаем валидацию через model_construct
+    adapter = serializer_for(ServiceModel)
+    construct = ServiceModel.model_construct
+    for line in fp:
+        line = line.strip()
+        if not line:
+            continue
+        if trusted:
+            yield construct(**json.loads(line))
+        else:
+            yield adapter.validate_json(line)
+
+
+def read_ndjson_fleet(fp, trusted=False) -> Fleet:
+    if trusted:
+        return Fleet(ServiceData(r["name"], r["replicas"], r["containers"])
+                     for r in map(json.loads, filter(bytes.strip, fp)))
+    return models_to_fleet(read_ndjson(fp))
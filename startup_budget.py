@@ -0,0 +1,75 @@
+import os
+import re
+import sys
+import argparse
+import subprocess
+import statistics
+
+# Бюджет времени импорта подкоманды cli, мс. Считается только то, что импортировано сверх
+# голого интерпретатора (python -c pass), поэтому site и .pth-хуки окружения не учитываются
+BUDGETS_MS = {
+    'agents': 20,
+    'agents-async': 80,
+    'lock': 30,
+    'timestamps': 20,
+    'scrape': 400,
+}
+RUNS = 5
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s+(.+)$')
+
+
+def parse_importtime(stderr):
+    # -> {модуль: собственное время импорта в мкс}
+    modules = {}
+    for line in stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            modules[match.group(3).strip()] = int(match.group(1))
+    return modules
+
+
+def _importtime(code):
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            cwd=REPO_DIR, capture_output=True, text=True, check=True)
+    return parse_importtime(result.stderr)
+
+
+def measure(subcommand, runs=RUNS):
+    # Медиана по нескольким запускам, в мс
+    baseline = set(_importtime('pass'))
+    samples = []
+    for _ in range(runs):
+        modules = _importtime(f'import cli; cli.resolve({subcommand!r})')
+        samples.append(sum(us for name, us in modules.items() if name not in baseline) / 1000)
+    return statistics.median(samples)
+
+
+def check(subcommands=None, runs=RUNS, scale=1.0):
+    results = {}
+    for name in subcommands or BUDGETS_MS:
+        results[name] = (measure(name, runs), BUDGETS_MS[name] * scale)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check cli subcommand import time against budgets.")
+    parser.add_argument("subcommands", nargs="*", help=f"Subcommands to check (default: all of {', '.join(BUDGETS_MS)})")
+    parser.add_argument("--runs", type=int, default=RUNS, help="Runs per subcommand (median is used)")
+    parser.add_argument("--scale", type=float, default=float(os.environ.get('STARTUP_BUDGET_SCALE', 1.0)),
+                        help="Multiply all budgets, e.g. for slow CI machines")
+    args = parser.parse_args(argv)
+    unknown = set(args.subcommands) - set(BUDGETS_MS)
+    if unknown:
+        parser.error(f"no budget for: {', '.join(sorted(unknown))}")
+
+    over = 0
+    for name, (elapsed, budget) in check(args.subcommands, args.runs, args.scale).items():
+        status = 'ok' if elapsed <= budget else 'OVER'
+        over += status == 'OVER'
+        print(f"{name:>14}: {elapsed:7.1f} ms / {budget:6.1f} ms  {status}")
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,46 +1,291 @@
 import os
+import sys
+import stat
 import time
 import argparse
+import threading
 from datetime import datetime
 
+# glob и concurrent.futures импортируются внутри функций: утилиту запускают
+# на каждый файл из shell-циклов, и одиночные режимы не должны платить за пул потоков
 
-def sync_timestamps(source_path, target_path):
-    stat_info = os.stat(source_path)
-    os.utime(target_path, (stat_info.st_atime, stat_info.st_mtime))
-    print(f"Timestamps copied from '{source_path}' to '{target_path}'")
+DEFAULT_WORKERS = 16
+BATCH_SIZE = 512
+PROGRESS_INTERVAL = 0.5
+
+
+# Открытые дескрипторы каталогов и относительные имена вместо полных путей, где ОС это умеет
+HAS_DIR_FD = os.scandir in os.supports_fd and os.utime in os.supports_dir_fd and os.stat in os.supports_dir_fd
 
 
-def set_timestamp_manually(file_path, timestamp_str, attr='both'):
+def parse_timestamp_ns(timestamp_str):
     dt = datetime.fromisoformat(timestamp_str.replace(' ', 'T'))
-    timestamp = dt.timestamp()
+    return dt, round(dt.timestamp() * 1_000_000) * 1000
+
+
+def sync_timestamps(source_path, target_path, follow_symlinks=True):
+    # source_path и target_path могут быть открытыми дескрипторами
+    stat_info = os.stat(source_path, follow_symlinks=follow_symlinks)
+    os.utime(target_path, ns=(stat_info.st_atime_ns, stat_info.st_mtime_ns), follow_symlinks=follow_symlinks)
+    print(f"Timestamps copied from '{source_path}' to '{target_path}'")
+
+
+def set_timestamp_manually(file_path, timestamp_str, attr='both', follow_symlinks=True):
+    dt, timestamp_ns = parse_timestamp_ns(timestamp_str)
 
-    stat_info = os.stat(file_path)
+    stat_info = os.stat(file_path, follow_symlinks=follow_symlinks)
     if attr == 'both':
-        os.utime(file_path, (timestamp, timestamp))
+        os.utime(file_path, ns=(timestamp_ns, timestamp_ns), follow_symlinks=follow_symlinks)
     elif attr == 'mtime':
-        os.utime(file_path, (stat_info.st_atime, timestamp))
+        os.utime(file_path, ns=(stat_info.st_atime_ns, timestamp_ns), follow_symlinks=follow_symlinks)
     elif attr == 'atime':
-        os.utime(file_path, (timestamp, stat_info.st_mtime))
+        os.utime(file_path, ns=(timestamp_ns, stat_info.st_mtime_ns), follow_symlinks=follow_symlinks)
 
     print(f"Set timestamp(s) on '{file_path}' to {dt.isoformat()}")
 
 
-def main():
+class Progress:
+    def __init__(self, label, stream=None, interval=PROGRESS_INTERVAL):
+        self.label = label
+        self.stream = stream if stream is not None else sys.stderr
+        self.interval = interval
+        self.done = 0
+        self.failed = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+        self._last_report = 0.0
+
+    def update(self, done, failed=0, skipped=0):
+        with self._lock:
+            self.done += done
+            self.failed += failed
+            self.skipped += skipped
+            now = time.monotonic()
+            if now - self._last_report >= self.interval:
+                self._last_report = now
+                self._report(end='\r')
+
+    def finish(self):
+        with self._lock:
+            self._report(end='\n')
+
+    def _report(self, end):
+        print(f"{self.label}: {self.done} files ({self.skipped} unchanged, {self.failed} failed)",
+              end=end, file=self.stream, flush=True)
+
+
+def scan_tree(root, follow_symlinks=False):
+    # Отдаёт (rel_dir, [(name, stat_result), ...]) по каталогам. stat берётся у DirEntry,
+    # при HAS_DIR_FD — через дескриптор каталога, без повторного разбора полного пути
+    stack = ['']
+    while stack:
+        rel_dir = stack.pop()
+        dir_path = os.path.join(root, rel_dir) if rel_dir else os.fspath(root)
+        dir_fd = os.open(dir_path, os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0)) if HAS_DIR_FD else None
+        try:
+            entries = []
+            with os.scandir(dir_fd if HAS_DIR_FD else dir_path) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(os.path.join(rel_dir, entry.name))
+                    try:
+                        entries.append((entry.name, entry.stat(follow_symlinks=follow_symlinks)))
+                    except OSError:
+                        # битая ссылка при follow_symlinks=True
+                        continue
+        finally:
+            if dir_fd is not None:
+                os.close(dir_fd)
+        yield rel_dir, entries
+
+
+def iter_input_paths(patterns=None, from_stdin=False):
+    import glob
+    for pattern in patterns or []:
+        yield from glob.iglob(pattern, recursive=True)
+    if from_stdin:
+        for line in sys.stdin:
+            path = line.rstrip('\n')
+            if path:
+                yield path
+
+
+def _apply_dir_batch(target_dir, batch, follow_symlinks, verify_only, progress):
+    # Один дескриптор каталога на пачку: utime/stat идут по имени через dir_fd.
+    # batch: (name, (atime_ns, mtime_ns), size); если size задан, файл другого размера не трогаем
+    try:
+        dir_fd = os.open(target_dir, os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0)) if HAS_DIR_FD else None
+    except OSError:
+        # В цели нет такого подкаталога: вся пачка не применена, при проверке — вся отличается
+        progress.update(0, len(batch), 0)
+        return [name for name, _, _ in batch] if verify_only else []
+    changed = []
+    failed = skipped = 0
+    try:
+        for name, times_ns, size in batch:
+            path = name if dir_fd is not None else os.path.join(target_dir, name)
+            try:
+                stat_info = os.stat(path, dir_fd=dir_fd, follow_symlinks=follow_symlinks)
+                if size is not None and stat.S_ISREG(stat_info.st_mode) and stat_info.st_size != size:
+                    failed += 1
+                    continue
+                # atime каталога меняется от самого обхода, у каталогов сверяем только mtime
+                if stat.S_ISDIR(stat_info.st_mode):
+                    unchanged = stat_info.st_mtime_ns == times_ns[1]
+                else:
+                    unchanged = (stat_info.st_atime_ns, stat_info.st_mtime_ns) == times_ns
+                if unchanged:
+                    skipped += 1
+                    continue
+                changed.append(name)
+                if not verify_only:
+                    os.utime(path, ns=times_ns, dir_fd=dir_fd, follow_symlinks=follow_symlinks)
+            except OSError:
+                failed += 1
+                if verify_only:
+                    changed.append(name)
+    finally:
+        if dir_fd is not None:
+            os.close(dir_fd)
+    progress.update(len(batch) - failed - skipped, failed, skipped)
+    return changed
+
+
+def _set_times_batch(batch, times_ns, attr, follow_symlinks, progress):
+    failed = 0
+    for path in batch:
+        try:
+            if attr == 'both':
+                os.utime(path, ns=times_ns, follow_symlinks=follow_symlinks)
+            else:
+                stat_info = os.stat(path, follow_symlinks=follow_symlinks)
+                if attr == 'mtime':
+                    os.utime(path, ns=(stat_info.st_atime_ns, times_ns[1]), follow_symlinks=follow_symlinks)
+                else:
+                    os.utime(path, ns=(times_ns[0], stat_info.st_mtime_ns), follow_symlinks=follow_symlinks)
+        except OSError:
+            failed += 1
+    progress.update(len(batch) - failed, failed)
+
+
+def _run_batched(executor, items, submit):
+    futures = []
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= BATCH_SIZE:
+            futures.append(submit(batch))
+            batch = []
+    if batch:
+        futures.append(submit(batch))
+    for future in futures:
+        future.result()
+
+
+def _tree_batches(source_root, follow_symlinks):
+    for rel_dir, entries in scan_tree(source_root, follow_symlinks):
+        for i in range(0, len(entries), BATCH_SIZE):
+            chunk = entries[i:i + BATCH_SIZE]
+            yield rel_dir, [(name, (st.st_atime_ns, st.st_mtime_ns), None) for name, st in chunk]
+
+
+def bulk_sync_tree(source_root, target_root, workers=DEFAULT_WORKERS, progress=None,
+                   follow_symlinks=False, verify_only=False):
+    # Возвращает относительные пути, у которых времена отличались (и были исправлены, если не verify_only)
+    from concurrent.futures import ThreadPoolExecutor
+    progress = progress or Progress("Verified" if verify_only else "Synced")
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            (rel_dir, executor.submit(_apply_dir_batch, os.path.join(target_root, rel_dir), batch,
+                                      follow_symlinks, verify_only, progress))
+            for rel_dir, batch in _tree_batches(source_root, follow_symlinks)
+        ]
+        changed = [os.path.join(rel_dir, name) for rel_dir, future in futures for name in future.result()]
+    progress.finish()
+    return changed
+
+
+def verify_tree(source_root, target_root, workers=DEFAULT_WORKERS, progress=None, follow_symlinks=False):
+    return bulk_sync_tree(source_root, target_root, workers, progress, follow_symlinks, verify_only=True)
+
+
+def bulk_set_times(paths, times_ns, attr='both', workers=DEFAULT_WORKERS, progress=None, follow_symlinks=True):
+    from concurrent.futures import ThreadPoolExecutor
+    progress = progress or Progress("Updated")
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        _run_batched(executor, paths,
+                     lambda batch: executor.submit(_set_times_batch, batch, times_ns, attr, follow_symlinks, progress))
+    progress.finish()
+    return progress
+
+
+def main(argv=None):
     parser = argparse.ArgumentParser(description="Sync file timestamps.")
     parser.add_argument("-s", "--source", help="Source file")
-    parser.add_argument("-t", "--target", required=True, help="Target file")
+    parser.add_argument("-t", "--target", help="Target file")
     parser.add_argument("--set-time", help="Set time manually (ISO format: YYYY-MM-DD HH:MM:SS)")
     parser.add_argument("--attr", choices=['both', 'mtime', 'atime'], default='both', help="Which timestamp to set")
+    parser.add_argument("-r", "--recursive", action="store_true", help="Mirror timestamps from source tree to target tree")
+    parser.add_argument("--glob", action="append", help="Apply timestamp to files matching pattern (repeatable)")
+    parser.add_argument("--stdin", action="store_true", help="Read target file paths from stdin, one per line")
+    parser.add_argument("-j", "--workers", type=int, default=DEFAULT_WORKERS, help="Threads for bulk utime calls")
+    parser.add_argument("--no-dereference", action="store_true",
+                        help="Operate on symlinks themselves instead of their targets")
+    parser.add_argument("--verify", action="store_true",
+                        help="With --recursive: only report files whose timestamps differ, exit 1 if any")
+    parser.add_argument("--export-manifest", metavar="FILE", help="Snapshot timestamps of --target tree into FILE")
+    parser.add_argument("--restore-manifest", metavar="FILE", help="Restore timestamps of --target tree from FILE")
+
+    args = parser.parse_args(argv)
+
+    if args.verify and not args.recursive:
+        parser.error("--verify requires --recursive")
 
-    args = parser.parse_args()
+    follow_symlinks = not args.no_dereference
 
-    if args.source:
-        if not os.path.exists(args.source):
+    if args.glob or args.stdin:
+        if args.source:
+            stat_info = os.stat(args.source, follow_symlinks=follow_symlinks)
+            times_ns = (stat_info.st_atime_ns, stat_info.st_mtime_ns)
+        elif args.set_time:
+            _, timestamp_ns = parse_timestamp_ns(args.set_time)
+            times_ns = (timestamp_ns, timestamp_ns)
+        else:
+            now_ns = time.time_ns()
+            times_ns = (now_ns, now_ns)
+        bulk_set_times(iter_input_paths(args.glob, args.stdin), times_ns, args.attr, args.workers,
+                       follow_symlinks=follow_symlinks)
+        return
+
+    if not args.target:
+        parser.error("--target is required unless --glob or --stdin is used")
+
+    if args.export_manifest or args.restore_manifest:
+        from timestamp_manifest import export_manifest, restore_manifest
+        if args.export_manifest:
+            count = export_manifest(args.target, args.export_manifest, follow_symlinks)
+            print(f"Exported {count} entries from '{args.target}' to '{args.export_manifest}'")
+        else:
+            restore_manifest(args.restore_manifest, args.target, args.workers, follow_symlinks=follow_symlinks)
+        return
+
+    if args.recursive:
+        if not args.source or not os.path.isdir(args.source):
+            print(f"Source directory does not exist: {args.source}")
+            return
+        if args.verify:
+            changed = verify_tree(args.source, args.target, args.workers, follow_symlinks=follow_symlinks)
+            for rel_path in changed:
+                print(rel_path)
+            sys.exit(1 if changed else 0)
+        bulk_sync_tree(args.source, args.target, args.workers, follow_symlinks=follow_symlinks)
+    elif args.source:
+        if not os.path.lexists(args.source):
             print(f"Source file does not exist: {args.source}")
             return
-        sync_timestamps(args.source, args.target)
+        sync_timestamps(args.source, args.target, follow_symlinks)
     elif args.set_time:
-        set_timestamp_manually(args.target, args.set_time, args.attr)
+        set_timestamp_manually(args.target, args.set_time, args.attr, follow_symlinks)
     else:
         with open(args.target, 'a'):
             os.utime(args.target, None)
@@ -48,4 +293,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,75 @@
+import os
+import mmap
+import struct
+import itertools
+
+from timestamp_cheat import BATCH_SIZE, DEFAULT_WORKERS, Progress, scan_tree, _apply_dir_batch
+
+# Формат: заголовок (магия, версия, число записей), затем записи, отсортированные по (каталог, имя):
+# atime_ns, mtime_ns, size (int64), длина пути (uint32) и сам путь в байтах ОС
+MAGIC = b"TSMF"
+VERSION = 1
+HEADER = struct.Struct("<4sBQ")
+RECORD = struct.Struct("<qqqI")
+
+
+def _sort_key(rel_path):
+    # Записи одного каталога идут подряд, чтобы восстановление шло пачками по dir_fd
+    parent, name = os.path.split(rel_path)
+    return parent, name
+
+
+def export_manifest(root, manifest_path, follow_symlinks=False):
+    records = []
+    for rel_dir, entries in scan_tree(root, follow_symlinks):
+        dir_bytes = os.fsencode(rel_dir)
+        for name, st in entries:
+            records.append((os.path.join(dir_bytes, os.fsencode(name)), st.st_atime_ns, st.st_mtime_ns, st.st_size))
+    records.sort(key=lambda record: _sort_key(record[0]))
+
+    with open(manifest_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(records)))
+        for path, atime_ns, mtime_ns, size in records:
+            f.write(RECORD.pack(atime_ns, mtime_ns, size, len(path)))
+            f.write(path)
+    return len(records)
+
+
+def iter_manifest(manifest_path):
+    with open(manifest_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            magic, version, count = HEADER.unpack_from(mm, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"Not a timestamp manifest: {manifest_path}")
+            offset = HEADER.size
+            for _ in range(count):
+                atime_ns, mtime_ns, size, path_len = RECORD.unpack_from(mm, offset)
+                offset += RECORD.size
+                path = os.fsdecode(mm[offset:offset + path_len])
+                offset += path_len
+                yield path, atime_ns, mtime_ns, size
+
+
+def _restore_batches(manifest_path):
+    for rel_dir, records in itertools.groupby(iter_manifest(manifest_path), key=lambda r: os.path.dirname(r[0])):
+        while True:
+            chunk = list(itertools.islice(records, BATCH_SIZE))
+            if not chunk:
+                break
+            yield rel_dir, [(os.path.basename(path), (atime_ns, mtime_ns), size)
+                            for path, atime_ns, mtime_ns, size in chunk]
+
+
+def restore_manifest(manifest_path, root, workers=DEFAULT_WORKERS, progress=None, follow_symlinks=False):
+    # Трогаем только записи, у которых времена разошлись; файлы с другим размером не восстанавливаем
+    from concurrent.futures import ThreadPoolExecutor
+    progress = progress or Progress("Restored")
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            (rel_dir, executor.submit(_apply_dir_batch, os.path.join(root, rel_dir), batch,
+                                      follow_symlinks, False, progress))
+            for rel_dir, batch in _restore_batches(manifest_path)
+        ]
+        changed = [os.path.join(rel_dir, name) for rel_dir, future in futures for name in future.result()]
+    progress.finish()
+    return changed
@@ -0,0 +1,159 @@
+import os
+import math
+
+# Размер пула процессов по реально доступным контейнеру ядрам: маска affinity, квота cgroup
+# (v2 cpu.max, при гибридной иерархии — v1 cpu.cfs_quota_us) и NUMA-узлы из /sys.
+#   with make_process_pool(N_AGENT) as executor: ...
+# Закрепление воркеров за ядрами включается флагом --pin-workers или CI_PIN_WORKERS=1
+
+CGROUP_ROOT = '/sys/fs/cgroup'
+NODE_ROOT = '/sys/devices/system/node'
+PIN_WORKERS = os.environ.get('CI_PIN_WORKERS', '') not in ('', '0')
+
+
+def available_cpus():
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _cgroup_paths(proc_cgroup='/proc/self/cgroup'):
+    # -> {контроллер или '' для v2: путь группы}
+    paths = {}
+    for line in (_read(proc_cgroup) or '').splitlines():
+        _, controllers, path = line.split(':', 2)
+        for controller in controllers.split(',') if controllers else ['']:
+            paths[controller] = path
+    return paths
+
+
+def _ancestors(mount, path):
+    # Группа процесса и все родители до корня: квота родителя ограничивает и потомков
+    parts = [part for part in path.split('/') if part]
+    for depth in range(len(parts), -1, -1):
+        yield os.path.join(mount, *parts[:depth])
+
+
+def _v2_mount(root):
+    for mount in (root, os.path.join(root, 'unified')):
+        if os.path.exists(os.path.join(mount, 'cgroup.controllers')):
+            return mount
+    return None
+
+
+def _v2_limits(mount, path):
+    for group in _ancestors(mount, path):
+        quota, _, period = (_read(os.path.join(group, 'cpu.max')) or 'max').partition(' ')
+        if quota != 'max':
+            yield int(quota) / int(period or 100000)
+
+
+def _v1_limits(mount, path):
+    for group in _ancestors(mount, path):
+        quota = _read(os.path.join(group, 'cpu.cfs_quota_us'))
+        period = _read(os.path.join(group, 'cpu.cfs_period_us'))
+        if quota and period and int(quota) > 0:
+            yield int(quota) / int(period)
+
+
+def cgroup_cpu_limit(root=CGROUP_ROOT, proc_cgroup='/proc/self/cgroup'):
+    # Квота в ядрах (например, 1.5) или None, если ограничения нет
+    paths = _cgroup_paths(proc_cgroup)
+    limits = []
+    mount = _v2_mount(root)
+    if mount and '' in paths:
+        limits.extend(_v2_limits(mount, paths['']))
+    if not limits and 'cpu' in paths:
+        # Гибридная иерархия: контроллер cpu остался в v1
+        mount = next((m for m in (os.path.join(root, 'cpu'), os.path.join(root, 'cpu,cpuacct')) if os.path.isdir(m)), None)
+        if mount:
+            limits.extend(_v1_limits(mount, paths['cpu']))
+    return min(limits) if limits else None
+
+
+def effective_cpus(root=CGROUP_ROOT, proc_cgroup='/proc/self/cgroup'):
+    # Сколько процессов реально может крутиться одновременно без троттлинга
+    cpus = len(available_cpus())
+    limit = cgroup_cpu_limit(root, proc_cgroup)
+    if limit is not None:
+        cpus = min(cpus, max(1, math.floor(limit)))
+    return cpus
+
+
+def pool_size(requested=None, root=CGROUP_ROOT, proc_cgroup='/proc/self/cgroup'):
+    cpus = effective_cpus(root, proc_cgroup)
+    return min(requested, cpus) if requested else cpus
+
+
+def parse_cpulist(text):
+    # '0-3,8-11,16' -> [0, 1, 2, 3, 8, 9, 10, 11, 16]
+    cpus = []
+    for part in filter(None, (text or '').split(',')):
+        start, _, end = part.partition('-')
+        cpus.extend(range(int(start), int(end or start) + 1))
+    return cpus
+
+
+def numa_nodes(node_root=NODE_ROOT, cpus=None):
+    # -> {узел: [доступные ядра]}; без NUMA в /sys — один узел со всеми ядрами
+    cpus = set(available_cpus() if cpus is None else cpus)
+    nodes = {}
+    try:
+        entries = sorted(os.listdir(node_root))
+    except OSError:
+        entries = []
+    for entry in entries:
+        if entry.startswith('node') and entry[4:].isdigit():
+            node_cpus = [cpu for cpu in parse_cpulist(_read(os.path.join(node_root, entry, 'cpulist'))) if cpu in cpus]
+            if node_cpus:
+                nodes[int(entry[4:])] = node_cpus
+    return nodes or {0: sorted(cpus)}
+
+
+def pinning_plan(workers, node_root=NODE_ROOT, cpus=None):
+    # Ядра для воркеров: сначала заполняется один NUMA-узел, потом следующий, чтобы воркеры
+    # делили локальную память и кэш. Воркеров больше, чем ядер, — ядра идут по кругу
+    ordered = [cpu for node_cpus in numa_nodes(node_root, cpus).values() for cpu in node_cpus]
+    return [ordered[i % len(ordered)] for i in range(workers)]
+
+
+def _pin_worker(cpu_queue):
+    # initializer ProcessPoolExecutor: каждый воркер забирает своё ядро из очереди
+    import queue
+    try:
+        cpu = cpu_queue.get(timeout=1)
+    except queue.Empty:
+        return
+    os.sched_setaffinity(0, {cpu})
+
+
+def make_process_pool(max_workers=None, pin=None):
+    from concurrent.futures import ProcessPoolExecutor
+    workers = pool_size(max_workers)
+    pin = PIN_WORKERS if pin is None else pin
+    if not pin or not hasattr(os, 'sched_setaffinity'):
+        return ProcessPoolExecutor(max_workers=workers)
+    import multiprocessing
+    cpu_queue = multiprocessing.Queue()
+    for cpu in pinning_plan(workers):
+        cpu_queue.put(cpu)
+    return ProcessPoolExecutor(max_workers=workers, initializer=_pin_worker, initargs=(cpu_queue,))
+
+
+def describe(requested=None, root=CGROUP_ROOT, proc_cgroup='/proc/self/cgroup'):
+    # requested — то же число, что передаётся в make_process_pool, чтобы отчёт совпадал с реальным пулом
+    limit = cgroup_cpu_limit(root, proc_cgroup)
+    return (f"affinity {len(available_cpus())} cpus, cgroup quota {limit if limit is not None else 'none'}, "
+            f"NUMA nodes {len(numa_nodes())} -> pool of {pool_size(requested, root, proc_cgroup)}")
+
+
+if __name__ == "__main__":
+    print(describe())
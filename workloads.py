@@ -0,0 +1,202 @@
+import csv
+import json
+import math
+import random
+from datetime import datetime
+from itertools import islice
+from typing import NamedTuple
+
+from CIagents import NUM_TASKS, TASK_DURATION_MIN, TASK_DURATION_MAX
+
+
+class Task(NamedTuple):
+    task_id: int
+    duration: float
+    arrival: float = 0.0  # секунды от начала прогона
+    kind: str = 'io'      # 'io' или 'cpu'
+    demand: object = None  # placement.Resources; None — требования по умолчанию для kind
+
+
+# Процессы поступления: бесконечные генераторы моментов прихода задач (секунды от старта)
+
+def all_at_once():
+    while True:
+        yield 0.0
+
+
+def poisson_arrivals(rate, rng):
+    t = 0.0
+    while True:
+        t += rng.expovariate(rate)
+        yield t
+
+
+def bursty_arrivals(rate, rng, mean_burst=10, spread=0.01):
+    # Пачки задач: моменты пачек — пуассоновские, размер пачки — геометрический со средним mean_burst,
+    # внутри пачки задачи идут почти подряд. Средняя интенсивность остаётся равной rate
+    t = 0.0
+    while True:
+        t += rng.expovariate(rate / mean_burst)
+        size = 1 + int(math.log(1.0 - rng.random()) / math.log(1.0 - 1.0 / mean_burst)) if mean_burst > 1 else 1
+        burst_t = t
+        for _ in range(size):
+            yield burst_t
+            burst_t += rng.expovariate(1.0 / spread)
+
+
+def diurnal_arrivals(rate, rng, peak_factor=3.0, period=86400.0):
+    # Неоднородный пуассоновский процесс (прореживание): от rate ночью до rate * peak_factor в пике
+    rate_max = rate * peak_factor
+    t = 0.0
+    while True:
+        t += rng.expovariate(rate_max)
+        current = rate * (1 + (peak_factor - 1) * (1 - math.cos(2 * math.pi * t / period)) / 2)
+        if rng.random() * rate_max <= current:
+            yield t
+
+
+def diurnal_period(num_tasks, rate, peak_factor=3.0):
+    # Период, за который num_tasks задач проходят ровно один цикл «ночь — пик — ночь»:
+    # средняя интенсивность diurnal_arrivals — rate * (1 + peak_factor) / 2
+    return num_tasks / (rate * (1 + peak_factor) / 2)
+
+
+# Распределения длительностей: бесконечные генераторы секунд
+
+def uniform_durations(rng, low=TASK_DURATION_MIN, high=TASK_DURATION_MAX):
+    while True:
+        yield rng.uniform(low, high)
+
+
+def lognormal_durations(rng, median=1.0, sigma=1.0):
+    while True:
+        yield rng.lognormvariate(math.log(median), sigma)
+
+
+def pareto_durations(rng, alpha=1.5, minimum=0.2, cap=60.0):
+    # Тяжёлый хвост: большинство задач короткие, редкие — на порядки длиннее
+    while True:
+        yield min(minimum * rng.paretovariate(alpha), cap)
+
+
+ARRIVALS = {'once': all_at_once, 'poisson': poisson_arrivals, 'bursty': bursty_arrivals,
+            'diurnal': diurnal_arrivals}
+DURATIONS = {'uniform': uniform_durations, 'lognormal': lognormal_durations, 'pareto': pareto_durations}
+
+
+def generate_workload(num_tasks=NUM_TASKS, arrivals='poisson', durations='pareto', rate=2.0,
+                      io_fraction=0.8, seed=None, arrival_options=None, duration_options=None):
+    # Ленивый генератор Task; одинаковый seed даёт одинаковую нагрузку. num_tasks=None — бесконечно
+    rng = random.Random(seed)
+    if arrivals == 'once':
+        arrival_times = all_at_once()
+    else:
+        arrival_times = ARRIVALS[arrivals](rate, rng, **(arrival_options or {}))
+    duration_values = DURATIONS[durations](rng, **(duration_options or {}))
+    tasks = (
+        Task(task_id, duration, arrival, 'io' if rng.random() < io_fraction else 'cpu')
+        for task_id, (arrival, duration) in enumerate(zip(arrival_times, duration_values))
+    )
+    return islice(tasks, num_tasks)
+
+
+def uniform_workload(num_tasks=NUM_TASKS, seed=None):
+    # Прежняя нагрузка: равномерные длительности, все задачи в момент 0
+    return generate_workload(num_tasks, 'once', 'uniform', io_fraction=1.0, seed=seed)
+
+
+def _parse_time(value):
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def _parse_demand(row):
+    if all(row.get(dim) in (None, '') for dim in ('cpu', 'mem', 'io')):
+        return None
+    from placement import DEFAULT_DEMANDS, Resources
+    default = DEFAULT_DEMANDS[row.get('kind') or 'io']
+    return Resources(
+        cpu=float(row['cpu']) if row.get('cpu') not in (None, '') else default.cpu,
+        mem=int(row['mem']) if row.get('mem') not in (None, '') else default.mem,
+        io=float(row['io']) if row.get('io') not in (None, '') else default.io,
+    )
+
+
+def _trace_rows(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        if str(path).endswith(('.jsonl', '.ndjson')):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(f)
+
+
+def replay_trace(path, time_scale=1.0):
+    # Записанный трейс CI-задач (CSV или JSONL) с полями submit_time, duration и необязательными
+    # task_id, kind и cpu/mem/io (требования задачи). Интервалы между приходами сохраняются
+    # (умножаются на time_scale). Записи должны идти по возрастанию submit_time: трейс читается потоком,
+    # и задача из прошлого получила бы отрицательное время прихода
+    start = previous = None
+    for line_no, row in enumerate(_trace_rows(path), 1):
+        try:
+            submitted = _parse_time(row['submit_time'])
+            duration = float(row['duration'])
+            demand = _parse_demand(row)
+        except (KeyError, ValueError) as e:
+            raise ValueError(f"{path}: bad trace record {line_no}: {e}") from None
+        if start is None:
+            start = submitted
+        elif submitted < previous:
+            raise ValueError(f"{path}: trace record {line_no} was submitted before record {line_no - 1}, "
+                             "sort the trace by submit_time")
+        previous = submitted
+        task_id = int(row['task_id']) if row.get('task_id') not in (None, '') else line_no - 1
+        yield Task(task_id, duration * time_scale, (submitted - start) * time_scale, row.get('kind') or 'io', demand)
+
+
+def wait_summary(results):
+    # results: (task_id, ожидание в очереди, время выполнения)
+    waits = sorted(waited for _, waited, _ in results)
+    if not waits:
+        return {'tasks': 0, 'mean_wait': 0.0, 'p95_wait': 0.0, 'max_wait': 0.0}
+    return {
+        'tasks': len(waits),
+        'mean_wait': sum(waits) / len(waits),
+        'p95_wait': waits[min(len(waits) - 1, int(len(waits) * 0.95))],
+        'max_wait': waits[-1],
+    }
+
+
+def add_workload_arguments(parser):
+    parser.add_argument("--workload", choices=['uniform'] + [name for name in ARRIVALS if name != 'once'],
+                        default='uniform', help="Arrival process ('uniform': all tasks at t=0, the old behaviour)")
+    parser.add_argument("--durations", choices=list(DURATIONS), default='pareto', help="Task duration distribution")
+    parser.add_argument("--rate", type=float, default=2.0, help="Mean arrivals per second")
+    parser.add_argument("--period", type=float,
+                        help="Day length in seconds for --workload diurnal (default: one cycle over the run)")
+    parser.add_argument("--io-fraction", type=float, default=0.8, help="Share of I/O tasks, the rest are CPU tasks")
+    parser.add_argument("--seed", type=int, help="Seed for a reproducible workload")
+    parser.add_argument("--trace", help="Replay a recorded CSV/JSONL job trace instead of generating one")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="Compress (<1) or stretch (>1) the trace")
+    parser.add_argument("--placement", choices=['best_fit', 'first_fit'],
+                        help="Pack tasks onto agents by cpu/mem/io instead of one task per agent")
+
+
+def workload_from_args(args):
+    # None — старая равномерная нагрузка, раннеры работают как раньше
+    # --tasks не задан (None): трейс проигрывается целиком, генераторы берут NUM_TASKS
+    if args.trace:
+        trace = replay_trace(args.trace, args.time_scale)
+        return trace if args.tasks is None else islice(trace, args.tasks)
+    if args.workload == 'uniform':
+        return None
+    num_tasks = NUM_TASKS if args.tasks is None else args.tasks
+    arrival_options = None
+    if args.workload == 'diurnal':
+        # С периодом в сутки короткий прогон целиком приходится на ночь и ничем не отличается от poisson
+        arrival_options = {'period': args.period or diurnal_period(num_tasks, args.rate)}
+    return generate_workload(num_tasks, args.workload, args.durations, args.rate, args.io_fraction, args.seed,
+                             arrival_options)